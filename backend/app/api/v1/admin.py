@@ -7,17 +7,18 @@ from app.rag.qdrant_client import QdrantClient, get_qdrant_client
 
 router = APIRouter(prefix="/admin")
 
+# Настройки неизменны в пределах процесса — читаем их один раз при импорте
+_COLLECTION = get_settings().qdrant_collection
+
 
 @router.get("/health")
 async def health(
     qdrant: QdrantClient = Depends(get_qdrant_client),
 ) -> dict[str, bool | str]:
     """Проверка здоровья сервиса с проверкой Qdrant."""
-    settings = get_settings()
-    
     qdrant_ok = False
     try:
-        result = await qdrant.scroll(collection=settings.qdrant_collection, limit=1)
+        result = await qdrant.scroll(collection=_COLLECTION, limit=1)
         qdrant_ok = isinstance(result, list)
     except Exception:
         qdrant_ok = False
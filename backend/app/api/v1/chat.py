@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator
 from zoneinfo import ZoneInfo
 
+import orjson
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.booking.entities import extract_booking_entities_ru
+from app.booking.entities import BookingEntities, extract_booking_entities_ru
 from app.chat.composer import ChatComposer
 from app.chat.intent import detect_intent
 from app.core.config import get_settings
@@ -17,6 +19,8 @@ from app.session import get_session_store
 
 router = APIRouter(prefix="/chat", dependencies=[Depends(verify_api_key)])
 
+_NON_STREAMING_INTENTS = frozenset({"booking_quote", "booking_calculation", "knowledge_lookup"})
+
 
 def get_composer() -> ChatComposer:  # pragma: no cover - переопределяется в main
     raise RuntimeError("Composer dependency is not configured")
@@ -32,11 +36,10 @@ class ChatResponse(BaseModel):
     debug: dict[str, Any] | None = None
 
 
-@router.post("", response_model=ChatResponse, response_model_exclude_none=True)
-async def chat_endpoint(
-    payload: ChatRequest, composer: ChatComposer = Depends(get_composer)
-) -> ChatResponse:
-    settings = get_settings()
+async def _resolve_intent(
+    payload: ChatRequest, composer: ChatComposer
+) -> tuple[str, BookingEntities, str]:
+    """Определяет intent сообщения и обновляет сессию."""
     session_store = get_session_store()
 
     now = datetime.now(ZoneInfo("UTC"))
@@ -57,18 +60,31 @@ async def chat_endpoint(
                 "last_seen": now.isoformat(),
             },
         )
+    return intent, entities, session_id
+
 
+async def _dispatch(
+    intent: str,
+    session_id: str,
+    payload: ChatRequest,
+    entities: BookingEntities,
+    composer: ChatComposer,
+) -> dict[str, Any]:
     if intent == "booking_quote":
-        result = await composer.handle_booking(session_id, payload.message)
-    elif intent == "booking_calculation":
-        result = await composer.handle_booking_calculation(
+        return await composer.handle_booking(session_id, payload.message)
+    if intent == "booking_calculation":
+        return await composer.handle_booking_calculation(
             session_id, payload.message, entities
         )
-    elif intent == "knowledge_lookup":
-        result = await composer.handle_knowledge(payload.message, session_id=session_id)
-    else:
-        result = await composer.handle_general(payload.message, intent=intent, session_id=session_id)
+    if intent == "knowledge_lookup":
+        return await composer.handle_knowledge(payload.message, session_id=session_id)
+    return await composer.handle_general(payload.message, intent=intent, session_id=session_id)
+
 
+def _build_response_payload(
+    result: dict[str, Any], intent: str, entities: BookingEntities
+) -> dict[str, Any]:
+    settings = get_settings()
     debug = result.get("debug", {})
     debug.setdefault("intent", intent)
     debug.setdefault("intent_detected", intent)
@@ -85,4 +101,56 @@ async def chat_endpoint(
     # В проде debug скрыт по умолчанию и включается только через INCLUDE_DEBUG.
     if settings.include_debug:
         response_payload["debug"] = debug
-    return ChatResponse(**response_payload)
+    return response_payload
+
+
+def _sse_event(data: dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post("", response_model=ChatResponse, response_model_exclude_none=True)
+async def chat_endpoint(
+    payload: ChatRequest, composer: ChatComposer = Depends(get_composer)
+) -> ChatResponse:
+    intent, entities, session_id = await _resolve_intent(payload, composer)
+    result = await _dispatch(intent, session_id, payload, entities, composer)
+    return ChatResponse(**_build_response_payload(result, intent, entities))
+
+
+@router.post("/stream")
+async def chat_stream_endpoint(
+    payload: ChatRequest, composer: ChatComposer = Depends(get_composer)
+) -> StreamingResponse:
+    """
+    Тот же чат, но ответ отдаётся как Server-Sent Events.
+
+    События:
+    - ``data: {"delta": "..."}`` — очередной фрагмент ответа LLM;
+    - ``data: {"answer": "...", "debug": {...}}`` — итоговый ответ после
+      постобработки (клиент заменяет им накопленный текст);
+    - ``data: [DONE]`` — конец потока.
+
+    Сценарии бронирования и knowledge_lookup отдают только итоговое событие.
+    """
+    intent, entities, session_id = await _resolve_intent(payload, composer)
+
+    async def events() -> AsyncIterator[bytes]:
+        if intent in _NON_STREAMING_INTENTS:
+            result = await _dispatch(intent, session_id, payload, entities, composer)
+        else:
+            result = {}
+            async for event in composer.stream_general(
+                payload.message, intent=intent, session_id=session_id
+            ):
+                if "delta" in event:
+                    yield _sse_event({"delta": event["delta"]})
+                else:
+                    result = event
+        yield _sse_event(_build_response_payload(result, intent, entities))
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
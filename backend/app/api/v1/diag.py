@@ -16,6 +16,9 @@ from app.session import SessionStore, get_session_store
 
 router = APIRouter(prefix="/diag", dependencies=[Depends(verify_api_key)])
 
+# Настройки неизменны в пределах процесса — читаем их один раз при импорте
+_COLLECTION = get_settings().qdrant_collection
+
 
 class QdrantSample(BaseModel):
     scroll_samples: list[dict[str, Any]]
@@ -32,9 +35,7 @@ async def qdrant_sample(
     limit: int = Query(3, ge=1, le=10),
     qdrant: QdrantClient = Depends(get_qdrant_client),
 ) -> QdrantSample:
-    settings = get_settings()
-
-    scroll_hits = await qdrant.scroll(collection=settings.qdrant_collection, limit=limit)
+    scroll_hits = await qdrant.scroll(collection=_COLLECTION, limit=limit)
     scroll_samples = []
     for item in scroll_hits:
         if not isinstance(item, dict):
@@ -49,7 +50,7 @@ async def qdrant_sample(
     search_samples: list[dict[str, Any]] = []
     if vector:
         hits = await qdrant_search(
-            vector, client=qdrant, limit=limit, collection=settings.qdrant_collection
+            vector, client=qdrant, limit=limit, collection=_COLLECTION
         )
         for hit in hits[:limit]:
             if not isinstance(hit, dict):
@@ -129,7 +130,7 @@ async def feature_flags_status() -> FeatureFlagsStatus:
 async def reset_circuit_breakers() -> dict[str, str]:
     """Сбрасывает все circuit breakers в CLOSED состояние."""
     registry = get_circuit_breaker_registry()
-    await registry.reset_all()
+    registry.reset_all()
     return {"status": "ok", "message": "All circuit breakers reset to CLOSED"}
 
 
@@ -155,7 +156,6 @@ async def health_check(
     session_store: SessionStore = Depends(get_session_store),
 ) -> HealthStatus:
     """Проверка состояния всех компонентов системы."""
-    settings = get_settings()
     feature_flags = get_feature_flags_service()
     
     components: dict[str, bool] = {}
@@ -168,7 +168,7 @@ async def health_check(
     
     # Проверка Qdrant
     try:
-        result = await qdrant.scroll(collection=settings.qdrant_collection, limit=1)
+        result = await qdrant.scroll(collection=_COLLECTION, limit=1)
         components["qdrant"] = isinstance(result, list)
     except Exception:
         components["qdrant"] = False
@@ -177,7 +177,7 @@ async def health_check(
     try:
         from app.rag.embed_client import get_embed_client
         embed_client = get_embed_client()
-        embeddings, error, _ = await embed_client.embed(["health check"])
+        embeddings, error, _ = await embed_client.embed(["health check"], use_cache=False)
         components["embed"] = bool(embeddings) and not error
     except Exception:
         components["embed"] = False
@@ -1,8 +1,10 @@
-from typing import Any, TYPE_CHECKING
+from typing import Any, AsyncIterator, TYPE_CHECKING
 
+import asyncio
 import logging
 import re
 import time
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 
 import asyncpg
@@ -29,6 +31,34 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Запросы к LLM, продолжающиеся после хеджированного ответа (для кэша).
+# Композер создаётся на каждый запрос, поэтому сильные ссылки на задачи
+# хранятся на уровне модуля — иначе задачу может собрать GC.
+_BACKGROUND_TASKS: set[asyncio.Task[str]] = set()
+
+
+def _on_background_llm_done(task: asyncio.Task[str]) -> None:
+    _BACKGROUND_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background LLM request failed: %s", task.exception())
+
+
+@dataclass(slots=True)
+class _GeneralTurn:
+    """Подготовленный ход общего диалога: контекст RAG и сообщения для LLM."""
+
+    debug: dict[str, Any]
+    mode: str
+    context_text: str = ""
+    rag_hits: dict[str, Any] = field(default_factory=dict)
+    qdrant_hits: list[dict[str, Any]] = field(default_factory=list)
+    faq_hits: list[dict[str, Any]] = field(default_factory=list)
+    messages: list[dict[str, str]] = field(default_factory=list)
+    # Ключ LLM-кэша, посчитанный при проверке кэша (None — кэш выключен)
+    cache_key: str | None = None
+    # Готовый ответ без вызова LLM (сработал guard или попадание в кэш)
+    result: dict[str, Any] | None = None
+
 
 class ConversationStateStore:
     def get(self, session_id: str) -> SlotState | None:
@@ -851,7 +881,88 @@ class ChatComposer:
             intent: Определённый intent
             session_id: ID сессии для истории диалога
         """
+        turn = await self._prepare_general(text, intent=intent, session_id=session_id)
+        if turn.result is not None:
+            return turn.result
+
+        turn.debug["llm_called"] = True
+        llm_task = asyncio.ensure_future(self._ask_llm(turn, text, intent))
+
+        # Хеджирование: если LLM не уложилась в дедлайн, отвечаем по фрагментам
+        # RAG, а запрос к LLM дорабатывает в фоне и заполняет кэш.
+        hedge_timeout = self._settings.llm_hedge_timeout
+        if hedge_timeout > 0:
+            done, _ = await asyncio.wait({llm_task}, timeout=hedge_timeout)
+            if not done:
+                hedged = self._hedged_answer(turn, llm_task)
+                if hedged is not None:
+                    # В историю попадает ответ, который получил пользователь
+                    await self._save_to_history(session_id, "user", text)
+                    await self._save_to_history(session_id, "assistant", hedged["answer"])
+                    return hedged
+
+        try:
+            answer = await llm_task
+        except Exception as exc:  # noqa: BLE001
+            return self._general_llm_failure(turn, exc)
+
+        return await self._complete_general(turn, text, session_id, answer)
+
+    async def stream_general(
+        self,
+        text: str,
+        *,
+        intent: str = "general",
+        session_id: str = "anonymous",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Потоковая версия handle_general.
+
+        Отдаёт события {"delta": ...} по мере генерации ответа LLM, а последним
+        событием — итоговый результат {"answer", "debug"} в том же виде, что и
+        handle_general (после постобработки). Если стриминг выключен
+        (LLM_STREAMING_ENABLED) или LLM не нужна (guard, кэш), отдаётся только
+        итоговый результат.
+        """
+        if not self._settings.llm_streaming_enabled:
+            yield await self.handle_general(text, intent=intent, session_id=session_id)
+            return
+
+        turn = await self._prepare_general(text, intent=intent, session_id=session_id)
+        if turn.result is not None:
+            yield turn.result
+            return
+
+        debug = turn.debug
+        debug["llm_called"] = True
+        debug["llm_streamed"] = True
+        parts: list[str] = []
+        llm_started = time.perf_counter()
+        try:
+            async for chunk in self._llm.chat_stream(
+                model=self._settings.amvera_model, messages=turn.messages
+            ):
+                if not parts:
+                    debug["llm_first_token_ms"] = int(
+                        (time.perf_counter() - llm_started) * 1000
+                    )
+                parts.append(chunk)
+                yield {"delta": chunk}
+        except Exception as exc:  # noqa: BLE001
+            yield self._general_llm_failure(turn, exc)
+            return
+        debug["llm_latency_ms"] = int((time.perf_counter() - llm_started) * 1000)
+
+        answer = "".join(parts).strip()
+        await self._cache_llm_answer(turn, text, intent, answer)
+        yield await self._complete_general(turn, text, session_id, answer)
+
+    async def _prepare_general(
+        self, text: str, *, intent: str, session_id: str
+    ) -> _GeneralTurn:
+        """Собирает RAG-контекст и сообщения для LLM; guard и кэш отвечают сразу."""
         detail_mode = self._formatting_service.detect_detail_mode(text)
+        mode = "detail" if detail_mode else "brief"
 
         rag_hits = await gather_rag_data(
             query=text,
@@ -912,6 +1023,15 @@ class ChatComposer:
         debug["boosting_applied"] = rag_hits.get("boosting_applied", False)
         debug["intent_detected"] = rag_hits.get("intent_detected") or intent
 
+        turn = _GeneralTurn(
+            debug=debug,
+            mode=mode,
+            context_text=context_text,
+            rag_hits=rag_hits,
+            qdrant_hits=qdrant_hits,
+            faq_hits=faq_hits,
+        )
+
         if hits_total < self._settings.rag_min_facts:
             debug["guard_triggered"] = True
             if intent == "lodging":
@@ -927,28 +1047,30 @@ class ChatComposer:
                     "Если вы загрузили описание номеров/домиков в базу — скажите 'покажи варианты из базы'."
                 )
 
-            final_answer = self._formatting_service.postprocess_answer(
-                answer, mode="detail" if detail_mode else "brief"
-            )
-            return {"answer": final_answer, "debug": debug}
+            final_answer = self._formatting_service.postprocess_answer(answer, mode=mode)
+            turn.result = {"answer": final_answer, "debug": debug}
+            return turn
 
         # Проверяем LLM кэш
         if self._settings.llm_cache_enabled:
             llm_cache = get_llm_cache()
-            cached_answer, cached_debug = await llm_cache.get(text, intent, context_text)
+            turn.cache_key = llm_cache.make_key(text, intent, context_text)
+            cached_answer, cached_debug = await llm_cache.get(
+                text, intent, context_text, key=turn.cache_key
+            )
             if cached_answer:
                 debug["llm_cache_hit"] = True
                 debug["llm_called"] = False
                 if cached_debug:
                     debug.update({k: v for k, v in cached_debug.items() if k not in debug})
                 final_answer = self._formatting_service.postprocess_answer(
-                    cached_answer,
-                    mode="detail" if detail_mode else "brief",
+                    cached_answer, mode=mode
                 )
                 # Сохраняем в историю даже для кэшированных ответов
                 await self._save_to_history(session_id, "user", text)
                 await self._save_to_history(session_id, "assistant", final_answer)
-                return {"answer": final_answer, "debug": debug}
+                turn.result = {"answer": final_answer, "debug": debug}
+                return turn
 
         # Получаем историю диалога
         history = await self._get_conversation_history(session_id)
@@ -967,44 +1089,79 @@ class ChatComposer:
         
         # Текущее сообщение
         messages.append({"role": "user", "content": text})
+        turn.messages = messages
+        return turn
+
+    def _general_llm_failure(self, turn: _GeneralTurn, exc: Exception) -> dict[str, Any]:
+        """Ответ без LLM: собираем его из найденных фрагментов RAG."""
+        turn.debug["llm_error"] = str(exc)
+        rag_answer = self._build_rag_only_answer(
+            qdrant_hits=turn.qdrant_hits,
+            faq_hits=turn.faq_hits,
+            rag_hits=turn.rag_hits,
+        )
+        if rag_answer:
+            answer = self._formatting_service.postprocess_answer(rag_answer, mode=turn.mode)
+            return {"answer": answer, "debug": turn.debug}
+        return {
+            "answer": "Сейчас не удалось получить ответ из LLM. Попробуйте уточнить запрос чуть позже.",
+            "debug": turn.debug,
+        }
 
-        debug["llm_called"] = True
-        try:
-            llm_started = time.perf_counter()
-            answer = await self._llm.chat(
-                model=self._settings.amvera_model, messages=messages
-            )
-            debug["llm_latency_ms"] = int((time.perf_counter() - llm_started) * 1000)
-        except Exception as exc:  # noqa: BLE001
-            debug["llm_error"] = str(exc)
-            rag_answer = self._build_rag_only_answer(
-                qdrant_hits=qdrant_hits,
-                faq_hits=faq_hits,
-                rag_hits=rag_hits,
-            )
-            if rag_answer:
-                answer = self._formatting_service.postprocess_answer(
-                    rag_answer, mode="detail" if detail_mode else "brief"
-                )
-                return {"answer": answer, "debug": debug}
-            return {
-                "answer": "Сейчас не удалось получить ответ из LLM. Попробуйте уточнить запрос чуть позже.",
-                "debug": debug,
-            }
-
-        final_answer = self._formatting_service.postprocess_answer(
-            answer or "Нет данных в базе знаний.",
-            mode="detail" if detail_mode else "brief",
+    async def _ask_llm(self, turn: _GeneralTurn, text: str, intent: str) -> str:
+        """Запрос к LLM с записью ответа в кэш."""
+        llm_started = time.perf_counter()
+        answer = await self._llm.chat(
+            model=self._settings.amvera_model, messages=turn.messages
         )
+        turn.debug["llm_latency_ms"] = int((time.perf_counter() - llm_started) * 1000)
+        await self._cache_llm_answer(turn, text, intent, answer)
+        return answer
 
-        # Сохраняем в LLM кэш
+    async def _cache_llm_answer(
+        self, turn: _GeneralTurn, text: str, intent: str, answer: str
+    ) -> None:
         if self._settings.llm_cache_enabled and answer:
             llm_cache = get_llm_cache()
             await llm_cache.set(
-                text, intent, context_text, answer,
-                debug_info={"llm_latency_ms": debug.get("llm_latency_ms", 0)}
+                text, intent, turn.context_text, answer,
+                debug_info={"llm_latency_ms": turn.debug.get("llm_latency_ms", 0)},
+                key=turn.cache_key,
             )
 
+    def _hedged_answer(
+        self, turn: _GeneralTurn, llm_task: asyncio.Task[str]
+    ) -> dict[str, Any] | None:
+        """RAG-ответ вместо опоздавшей LLM; None, если фрагментов для него нет."""
+        rag_answer = self._build_rag_only_answer(
+            qdrant_hits=turn.qdrant_hits,
+            faq_hits=turn.faq_hits,
+            rag_hits=turn.rag_hits,
+        )
+        if not rag_answer:
+            return None
+
+        _BACKGROUND_TASKS.add(llm_task)
+        llm_task.add_done_callback(_on_background_llm_done)
+        debug = dict(turn.debug)
+        debug["llm_hedged"] = True
+        answer = self._formatting_service.postprocess_answer(rag_answer, mode=turn.mode)
+        return {"answer": answer, "debug": debug}
+
+    async def _complete_general(
+        self,
+        turn: _GeneralTurn,
+        text: str,
+        session_id: str,
+        answer: str,
+    ) -> dict[str, Any]:
+        """Постобработка ответа LLM и запись в историю диалога."""
+        debug = turn.debug
+        final_answer = self._formatting_service.postprocess_answer(
+            answer or "Нет данных в базе знаний.",
+            mode=turn.mode,
+        )
+
         # Сохраняем в историю диалога
         await self._save_to_history(session_id, "user", text)
         await self._save_to_history(session_id, "assistant", final_answer)
@@ -1204,9 +1361,13 @@ class ChatComposer:
         system_prompt = "\n\n".join(part for part in system_prompt_parts if part)
 
         # Проверяем LLM кэш
+        cache_key: str | None = None
         if self._settings.llm_cache_enabled:
             llm_cache = get_llm_cache()
-            cached_answer, cached_debug = await llm_cache.get(text, "knowledge_lookup", context_text)
+            cache_key = llm_cache.make_key(text, "knowledge_lookup", context_text)
+            cached_answer, cached_debug = await llm_cache.get(
+                text, "knowledge_lookup", context_text, key=cache_key
+            )
             if cached_answer:
                 debug["llm_cache_hit"] = True
                 debug["llm_called"] = False
@@ -1257,7 +1418,8 @@ class ChatComposer:
             llm_cache = get_llm_cache()
             await llm_cache.set(
                 text, "knowledge_lookup", context_text, answer,
-                debug_info={"llm_latency_ms": debug.get("llm_latency_ms", 0)}
+                debug_info={"llm_latency_ms": debug.get("llm_latency_ms", 0)},
+                key=cache_key,
             )
 
         # Сохраняем в историю
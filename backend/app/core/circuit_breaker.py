@@ -37,7 +37,7 @@ class CircuitBreakerConfig:
 
 @dataclass
 class CircuitBreakerStats:
-    """Статистика circuit breaker."""
+    """Статистика circuit breaker (время — по time.monotonic())."""
     total_calls: int = 0
     successful_calls: int = 0
     failed_calls: int = 0
@@ -71,11 +71,19 @@ class CircuitBreaker:
         self._name = name
         self._config = config or CircuitBreakerConfig()
         self._state = CircuitState.CLOSED
+        # Строковое имя состояния для логов и статуса (без Enum.value)
+        self._state_name: str = self._state.value
         self._failure_count = 0
         self._success_count = 0
-        self._last_failure_time: float = 0
-        self._lock = asyncio.Lock()
+        # time.monotonic() последней ошибки; None — ошибок не было
+        self._last_failure_time: float | None = None
         self._stats = CircuitBreakerStats()
+        # Конфигурация не меняется — часть статуса для неё собираем один раз
+        self._config_status: dict[str, Any] = {
+            "failure_threshold": self._config.failure_threshold,
+            "recovery_timeout": self._config.recovery_timeout,
+            "half_open_max_calls": self._config.half_open_max_calls,
+        }
 
     @property
     def name(self) -> str:
@@ -111,28 +119,28 @@ class CircuitBreaker:
         Raises:
             CircuitBreakerOpenError: Если breaker открыт и нет fallback
         """
+        # Проверка состояния и обновление счётчиков не содержат await, поэтому
+        # в однопоточном event loop выполняются атомарно и не требуют блокировки.
         self._stats.total_calls += 1
 
-        # Проверяем состояние и возможность перехода
-        async with self._lock:
-            if self._state == CircuitState.OPEN:
-                if self._should_attempt_reset():
-                    self._transition_to(CircuitState.HALF_OPEN)
-                else:
-                    self._stats.rejected_calls += 1
-                    logger.warning(
-                        "Circuit %s is OPEN, rejecting call (rejected=%d)",
-                        self._name, self._stats.rejected_calls
-                    )
-                    return await self._execute_fallback(fallback)
+        if self._state is CircuitState.OPEN:
+            if self._should_attempt_reset():
+                self._transition_to(CircuitState.HALF_OPEN)
+            else:
+                self._stats.rejected_calls += 1
+                logger.warning(
+                    "Circuit %s is OPEN, rejecting call (rejected=%d)",
+                    self._name, self._stats.rejected_calls
+                )
+                return await self._execute_fallback(fallback)
 
         # Выполняем вызов
         try:
             result = await func(*args, **kwargs)
-            await self._on_success()
+            self._on_success()
             return result
         except Exception as exc:
-            await self._on_failure(exc)
+            self._on_failure(exc)
             logger.warning(
                 "Circuit %s: call failed: %s (failures=%d/%d)",
                 self._name, exc, self._failure_count, self._config.failure_threshold
@@ -141,55 +149,56 @@ class CircuitBreaker:
 
     def _should_attempt_reset(self) -> bool:
         """Проверяет, пора ли пробовать восстановление."""
-        if self._last_failure_time == 0:
+        if self._last_failure_time is None:
             return True
-        elapsed = time.time() - self._last_failure_time
+        # monotonic не скачет при коррекции системных часов (NTP)
+        elapsed = time.monotonic() - self._last_failure_time
         return elapsed >= self._config.recovery_timeout
 
-    async def _on_success(self) -> None:
+    def _on_success(self) -> None:
         """Обрабатывает успешный вызов."""
-        async with self._lock:
-            self._stats.successful_calls += 1
-            self._stats.last_success_time = time.time()
-            
-            if self._state == CircuitState.HALF_OPEN:
-                self._success_count += 1
-                if self._success_count >= self._config.success_threshold:
-                    self._transition_to(CircuitState.CLOSED)
-            elif self._state == CircuitState.CLOSED:
-                # Сбрасываем счётчик ошибок при успехе
-                self._failure_count = 0
-
-    async def _on_failure(self, exc: Exception) -> None:
+        self._stats.successful_calls += 1
+        self._stats.last_success_time = time.monotonic()
+        
+        if self._state is CircuitState.HALF_OPEN:
+            self._success_count += 1
+            if self._success_count >= self._config.success_threshold:
+                self._transition_to(CircuitState.CLOSED)
+        elif self._state is CircuitState.CLOSED:
+            # Сбрасываем счётчик ошибок при успехе
+            self._failure_count = 0
+
+    def _on_failure(self, exc: Exception) -> None:
         """Обрабатывает неудачный вызов."""
-        async with self._lock:
-            self._stats.failed_calls += 1
-            self._stats.last_failure_time = time.time()
-            self._failure_count += 1
-            self._last_failure_time = time.time()
-            
-            if self._state == CircuitState.HALF_OPEN:
-                # При ошибке в HALF_OPEN сразу открываем
+        now = time.monotonic()
+        self._stats.failed_calls += 1
+        self._stats.last_failure_time = now
+        self._failure_count += 1
+        self._last_failure_time = now
+        
+        if self._state is CircuitState.HALF_OPEN:
+            # При ошибке в HALF_OPEN сразу открываем
+            self._transition_to(CircuitState.OPEN)
+        elif self._state is CircuitState.CLOSED:
+            if self._failure_count >= self._config.failure_threshold:
                 self._transition_to(CircuitState.OPEN)
-            elif self._state == CircuitState.CLOSED:
-                if self._failure_count >= self._config.failure_threshold:
-                    self._transition_to(CircuitState.OPEN)
 
     def _transition_to(self, new_state: CircuitState) -> None:
         """Переход в новое состояние."""
-        old_state = self._state
+        old_name = self._state_name
         self._state = new_state
+        self._state_name = new_state.value
         self._stats.state_changes += 1
         
-        if new_state == CircuitState.CLOSED:
+        if new_state is CircuitState.CLOSED:
             self._failure_count = 0
             self._success_count = 0
-        elif new_state == CircuitState.HALF_OPEN:
+        elif new_state is CircuitState.HALF_OPEN:
             self._success_count = 0
         
         logger.info(
             "Circuit %s: %s -> %s (changes=%d)",
-            self._name, old_state.value, new_state.value, self._stats.state_changes
+            self._name, old_name, self._state_name, self._stats.state_changes
         )
 
     async def _execute_fallback(
@@ -209,26 +218,21 @@ class CircuitBreaker:
         
         return fallback
 
-    async def reset(self) -> None:
+    def reset(self) -> None:
         """Принудительный сброс в CLOSED состояние."""
-        async with self._lock:
-            self._transition_to(CircuitState.CLOSED)
-            self._failure_count = 0
-            self._success_count = 0
-            self._last_failure_time = 0
+        self._transition_to(CircuitState.CLOSED)
+        self._failure_count = 0
+        self._success_count = 0
+        self._last_failure_time = None
 
     def get_status(self) -> dict[str, Any]:
         """Возвращает текущий статус breaker."""
         return {
             "name": self._name,
-            "state": self._state.value,
+            "state": self._state_name,
             "failure_count": self._failure_count,
             "success_count": self._success_count,
-            "config": {
-                "failure_threshold": self._config.failure_threshold,
-                "recovery_timeout": self._config.recovery_timeout,
-                "half_open_max_calls": self._config.half_open_max_calls,
-            },
+            "config": self._config_status,
             "stats": {
                 "total_calls": self._stats.total_calls,
                 "successful_calls": self._stats.successful_calls,
@@ -259,20 +263,21 @@ class CircuitBreakerRegistry:
         config: CircuitBreakerConfig | None = None,
     ) -> CircuitBreaker:
         """Получает или создаёт circuit breaker по имени."""
-        if name not in self._breakers:
-            self._breakers[name] = CircuitBreaker(
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(
                 name, config or self._default_config
             )
-        return self._breakers[name]
+        return breaker
 
     def set_default_config(self, config: CircuitBreakerConfig) -> None:
         """Устанавливает конфигурацию по умолчанию."""
         self._default_config = config
 
-    async def reset_all(self) -> None:
+    def reset_all(self) -> None:
         """Сбрасывает все breakers."""
         for breaker in self._breakers.values():
-            await breaker.reset()
+            breaker.reset()
 
     def get_all_status(self) -> dict[str, dict[str, Any]]:
         """Возвращает статус всех breakers."""
@@ -306,7 +311,12 @@ def get_circuit_breaker_registry() -> CircuitBreakerRegistry:
 
 
 def get_circuit_breaker(name: str) -> CircuitBreaker:
-    """Shortcut для получения circuit breaker по имени."""
+    """
+    Shortcut для получения circuit breaker по имени.
+
+    Клиенты внешних сервисов получают свой breaker один раз в __init__
+    и дальше обращаются к нему напрямую, минуя реестр.
+    """
     return get_circuit_breaker_registry().get(name)
 
 
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 import os
-from functools import lru_cache
-from typing import Literal
+from typing import Any, Literal, Mapping
 
 from pydantic import AnyHttpUrl, Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -91,6 +90,19 @@ class Settings(BaseSettings):
         alias="LLM_STREAMING_ENABLED",
         description="Включить streaming режим для LLM (быстрый первый токен)"
     )
+    llm_max_concurrency: int = Field(
+        16,
+        alias="LLM_MAX_CONCURRENCY",
+        description="Максимум одновременных запросов к LLM из одного процесса (квота провайдера)",
+    )
+    llm_hedge_timeout: float = Field(
+        0.0,
+        alias="LLM_HEDGE_TIMEOUT",
+        description=(
+            "Через сколько секунд ожидания LLM отвечать по фрагментам RAG, "
+            "не прерывая запрос к LLM (0 — отключено)"
+        ),
+    )
 
     # Shared caches (RAG/LLM)
     use_redis_cache: bool = Field(
@@ -103,6 +115,31 @@ class Settings(BaseSettings):
         alias="RAG_CACHE_TTL",
         description="TTL RAG-кэша в секундах",
     )
+
+    # Эмбеддинги
+    embed_cache_size: int = Field(
+        2048,
+        alias="EMBED_CACHE_SIZE",
+        description="Сколько эмбеддингов отдельных текстов держать в памяти (~3 КБ на вектор)",
+    )
+    embed_cache_ttl: float = Field(
+        3600.0,
+        alias="EMBED_CACHE_TTL",
+        description="TTL кэша эмбеддингов в секундах",
+    )
+    embed_batch_window_ms: float = Field(
+        2.0,
+        alias="EMBED_BATCH_WINDOW_MS",
+        description=(
+            "Окно (мс), в течение которого запросы эмбеддингов от разных "
+            "диалогов собираются в один POST (0 — отключено)"
+        ),
+    )
+    embed_batch_max_size: int = Field(
+        32,
+        alias="EMBED_BATCH_MAX_SIZE",
+        description="Максимум текстов в одном пакетном запросе эмбеддингов",
+    )
     
     # Redis state store
     use_redis_state_store: bool = Field(
@@ -141,12 +178,43 @@ class Settings(BaseSettings):
         
         return self
 
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
+    @classmethod
+    def from_trusted_env(cls, values: Mapping[str, Any]) -> "Settings":
+        """
+        Собирает Settings из заведомо корректных значений без валидации полей.
+
+        Для тестов и пересборок, где значения уже проверены: поля не
+        приводятся к типам, работает только fallback-логика Qdrant.
+        Ключи — имена полей или их алиасы (переменные окружения).
+        """
+        settings = cls.model_construct(**values)
+        return settings._resolve_qdrant_config()
+
+    # defer_build: схема валидации строится при первом создании Settings,
+    # а не при импорте модуля.
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        defer_build=True,
+    )
+
+
+_SETTINGS: Settings | None = None
 
 
-@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    return Settings()
+    """Возвращает настройки процесса (читаются из окружения один раз)."""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings()
+    return _SETTINGS
+
+
+def reset_settings() -> None:
+    """Сбрасывает настройки, чтобы перечитать окружение (для тестов)."""
+    global _SETTINGS
+    _SETTINGS = None
 
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["Settings", "get_settings", "reset_settings"]
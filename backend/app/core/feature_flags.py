@@ -7,14 +7,14 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any
 
 from app.core.config import get_settings, Settings
 
 
-@dataclass
+@dataclass(slots=True)
 class FeatureFlagStatus:
     """Статус одного feature flag."""
     
@@ -23,7 +23,7 @@ class FeatureFlagStatus:
     description: str
     category: str
     health_status: str = "unknown"  # "healthy", "degraded", "unavailable", "unknown"
-    details: dict[str, Any] = field(default_factory=dict)
+    details: dict[str, Any] | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -32,7 +32,7 @@ class FeatureFlagStatus:
             "description": self.description,
             "category": self.category,
             "health_status": self.health_status,
-            "details": self.details,
+            "details": self.details or {},
         }
 
 
@@ -50,9 +50,21 @@ class FeatureFlagsService:
 
     def __init__(self, settings: Settings | None = None) -> None:
         self._settings = settings or get_settings()
+        # Флаги зависят только от настроек процесса — строим их один раз,
+        # а health status обновляем на месте.
+        self._flags = self._build_flags()
+        self._flags_by_name = {flag.name: flag for flag in self._flags}
+        self._by_category: dict[str, list[FeatureFlagStatus]] = {}
+        for flag in self._flags:
+            self._by_category.setdefault(flag.category, []).append(flag)
+        # Сводка для /diag/features; сбрасывается при обновлении health status
+        self._summary: dict[str, Any] | None = None
 
     def get_all_flags(self) -> list[FeatureFlagStatus]:
         """Возвращает все feature flags с их статусами."""
+        return list(self._flags)
+
+    def _build_flags(self) -> list[FeatureFlagStatus]:
         return [
             # Storage
             FeatureFlagStatus(
@@ -112,14 +124,11 @@ class FeatureFlagsService:
 
     def get_flags_by_category(self, category: str) -> list[FeatureFlagStatus]:
         """Возвращает feature flags указанной категории."""
-        return [flag for flag in self.get_all_flags() if flag.category == category]
+        return list(self._by_category.get(category, ()))
 
     def get_flag(self, name: str) -> FeatureFlagStatus | None:
         """Возвращает конкретный feature flag по имени."""
-        for flag in self.get_all_flags():
-            if flag.name == name:
-                return flag
-        return None
+        return self._flags_by_name.get(name)
 
     def is_enabled(self, name: str) -> bool:
         """Проверяет, включён ли feature flag."""
@@ -128,22 +137,19 @@ class FeatureFlagsService:
 
     def get_summary(self) -> dict[str, Any]:
         """Возвращает сводку по всем feature flags."""
-        flags = self.get_all_flags()
-        by_category: dict[str, list[dict[str, Any]]] = {}
-        
-        for flag in flags:
-            if flag.category not in by_category:
-                by_category[flag.category] = []
-            by_category[flag.category].append(flag.to_dict())
-        
-        enabled_count = sum(1 for f in flags if f.enabled)
-        
-        return {
-            "total_flags": len(flags),
-            "enabled_count": enabled_count,
-            "disabled_count": len(flags) - enabled_count,
-            "by_category": by_category,
-        }
+        if self._summary is None:
+            flags = self._flags
+            enabled_count = sum(1 for f in flags if f.enabled)
+            self._summary = {
+                "total_flags": len(flags),
+                "enabled_count": enabled_count,
+                "disabled_count": len(flags) - enabled_count,
+                "by_category": {
+                    category: [flag.to_dict() for flag in category_flags]
+                    for category, category_flags in self._by_category.items()
+                },
+            }
+        return self._summary
 
     async def update_health_status(
         self,
@@ -154,7 +160,8 @@ class FeatureFlagsService:
         """
         Обновляет health status для флагов на основе реального состояния сервисов.
         """
-        flags = self.get_all_flags()
+        flags = self._flags
+        self._summary = None
         
         for flag in flags:
             if flag.name == "use_redis_state_store":
@@ -184,7 +191,7 @@ class FeatureFlagsService:
                 else:
                     flag.health_status = "disabled"
         
-        return flags
+        return list(flags)
 
 
 @lru_cache(maxsize=1)
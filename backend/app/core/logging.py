@@ -1,13 +1,47 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import logging.handlers
+import queue
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_LISTENER: logging.handlers.QueueListener | None = None
 
 
 def setup_logging(level: int = logging.INFO) -> None:
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    """
+    Настраивает корневой логгер.
+
+    Записи кладутся в очередь, а в stderr их пишет фоновый поток
+    QueueListener, чтобы запись логов не блокировала event loop.
+    """
+    global _LISTENER
+    root = logging.getLogger()
+    if _LISTENER is not None or root.handlers:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _LISTENER = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
     )
+    _LISTENER.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Останавливает фоновый поток логирования, дописав очередь."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
 
 
-__all__ = ["setup_logging"]
+__all__ = ["setup_logging", "shutdown_logging"]
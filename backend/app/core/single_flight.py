@@ -0,0 +1,55 @@
+"""
+Single-flight: объединение одновременных одинаковых запросов.
+
+Пока запрос с ключом уже выполняется, повторные вызовы с тем же ключом
+не порождают новый вызов внешнего сервиса, а ждут результат первого.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Дедупликация одновременных вызовов по ключу.
+
+    Вызов выполняется в отдельной задаче, поэтому отмена одного из ожидающих
+    (например, клиент закрыл соединение) не отменяет запрос для остальных.
+
+    Пример использования:
+    ```python
+    flight: SingleFlight[str] = SingleFlight()
+
+    answer = await flight.do(key, lambda: llm_client.chat(messages=messages))
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Выполняет func() или присоединяется к уже идущему вызову с тем же ключом."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future[T]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Помечаем исключение как полученное, даже если все ожидающие отменены
+            task.exception()
+
+
+__all__ = ["SingleFlight"]
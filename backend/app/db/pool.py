@@ -1,21 +1,51 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 import asyncpg
 
 from app.core.config import get_settings
+from app.db.queries.faq import FAQ_SEARCH_SQL
+
+logger = logging.getLogger(__name__)
 
 _pool: asyncpg.Pool | None = None
 
+# Запросы горячего пути, которые разбираются заранее на каждом соединении
+_WARM_STATEMENTS: tuple[tuple[str, tuple], ...] = (
+    (FAQ_SEARCH_SQL, ("", 0, 1.0)),
+)
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """
+    Прогревает кэш подготовленных выражений нового соединения.
+
+    Пробное выполнение с LIMIT 0 кладёт разобранный запрос в statement
+    cache asyncpg, и первый реальный поиск по FAQ не тратит round-trip
+    на parse/plan.
+    """
+    for sql, args in _WARM_STATEMENTS:
+        try:
+            await conn.fetch(sql, *args)
+        except Exception as exc:  # noqa: BLE001 - прогрев не должен ломать пул
+            logger.warning("Statement warmup failed: %s", exc)
+
 
 async def get_pool() -> asyncpg.Pool:
     global _pool
     if _pool is None:
         settings = get_settings()
-        _pool = await asyncpg.create_pool(settings.database_url, min_size=1, max_size=5)
+        _pool = await asyncpg.create_pool(
+            settings.database_url,
+            min_size=1,
+            max_size=5,
+            statement_cache_size=1024,
+            init=_init_connection,
+        )
     return _pool
 
 
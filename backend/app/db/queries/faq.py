@@ -2,26 +2,36 @@ from __future__ import annotations
 
 import asyncpg
 
+# similarity() считается один раз в подзапросе; порог min_similarity
+# применяется в SQL, чтобы лишние строки не доходили до Python.
+FAQ_SEARCH_SQL = """
+    SELECT question, answer, similarity
+    FROM (
+        SELECT question, answer, similarity(question, $1) AS similarity
+        FROM u4s_chatbot.faq
+        WHERE question % $1
+    ) AS matches
+    WHERE similarity >= $3
+    ORDER BY similarity DESC
+    LIMIT $2
+"""
+
 
 async def search_faq(
     pool: asyncpg.Pool, *, query: str, limit: int = 5, min_similarity: float = 0.35
 ) -> list[dict]:
-    sql = """
-        SELECT question, answer, similarity(question, $1) AS similarity
-        FROM u4s_chatbot.faq
-        WHERE question % $1
-        ORDER BY similarity(question, $1) DESC
-        LIMIT $2
-    """
     async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, query, limit)
-
-    result: list[dict] = []
-    for row in rows:
-        row_dict = dict(row)
-        if (row_dict.get("similarity") or 0.0) >= min_similarity:
-            result.append(row_dict)
-    return result
+        rows = await conn.fetch(FAQ_SEARCH_SQL, query, limit, min_similarity)
+    # Порог уже применён в SQL; собираем dict по известным полям напрямую,
+    # без обхода колонок Record в dict(row)
+    return [
+        {
+            "question": row["question"],
+            "answer": row["answer"],
+            "similarity": row["similarity"],
+        }
+        for row in rows
+    ]
 
 
-__all__ = ["search_faq"]
+__all__ = ["FAQ_SEARCH_SQL", "search_faq"]
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+from functools import partial
 from typing import Any, AsyncIterator, Sequence
 
 import httpx
+import orjson
 from fastapi import HTTPException
 import logging
 from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.core.config import get_settings
 from app.core.circuit_breaker import get_circuit_breaker, CircuitBreakerOpenError
+from app.core.single_flight import SingleFlight
 
 
 class AmveraLLMClient:
@@ -19,6 +23,7 @@ class AmveraLLMClient:
     - Обычные запросы с retry
     - Streaming для быстрого первого токена
     - Circuit breaker для защиты от каскадных сбоев
+    - Объединение одновременных одинаковых запросов (single-flight)
     """
 
     def __init__(
@@ -45,9 +50,34 @@ class AmveraLLMClient:
             write=settings.request_timeout,
             pool=settings.request_timeout,
         )
-        self._client = httpx.AsyncClient(timeout=http_timeout)
+        # Неизменяемые части запроса собираем один раз, а не на каждый вызов
+        self._url = f"{self._api_url}/models/{self._inference_name}"
+        self._base_payload: dict[str, Any] = {
+            "model": self._model,
+            "temperature": self._temperature,
+            "max_tokens": self._max_tokens,
+        }
+        # Один пул на процесс: keep-alive и HTTP/2 избавляют от TLS-рукопожатия
+        # на каждый запрос к Amvera.
+        self._client = httpx.AsyncClient(
+            timeout=http_timeout,
+            headers={
+                "X-Auth-Token": f"Bearer {self._api_token}",
+                "Content-Type": "application/json",
+            },
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=32,
+                keepalive_expiry=30.0,
+            ),
+        )
         self._logger = logging.getLogger(__name__)
         self._circuit_breaker = get_circuit_breaker("llm_service")
+        self._single_flight: SingleFlight[str] = SingleFlight()
+        # Ограничиваем всплески под квоту провайдера: лишние запросы ждут
+        # слот, а не получают 429 и не уходят в повторы.
+        self._semaphore = asyncio.Semaphore(max(1, settings.llm_max_concurrency))
 
     async def close(self) -> None:
         await self._client.aclose()
@@ -62,18 +92,42 @@ class AmveraLLMClient:
         if settings.llm_dry_run:
             return "[LLM отключён: режим dry-run]"
 
-        # Используем circuit breaker
+        # Одинаковые запросы, пришедшие одновременно, ждут один вызов LLM
+        key = self._flight_key(model or self._model, messages)
         try:
-            return await self._circuit_breaker.call(
-                self._do_chat,
-                model=model,
-                messages=messages,
-                fallback=self._fallback_response,
+            return await self._single_flight.do(
+                key,
+                partial(
+                    self._circuit_breaker.call,
+                    self._do_chat,
+                    model=model,
+                    messages=messages,
+                    fallback=self._fallback_response,
+                ),
             )
         except CircuitBreakerOpenError:
             self._logger.warning("Circuit breaker is open, returning fallback")
             return self._fallback_response()
 
+    @staticmethod
+    def _flight_key(model: str, messages: Sequence[dict[str, str]]) -> str:
+        """Ключ для объединения одинаковых запросов: модель + все сообщения."""
+        digest = hashlib.blake2b(model.encode(), digest_size=16)
+        for message in messages:
+            digest.update(b"\x1e")
+            digest.update(str(message.get("role", "")).encode())
+            digest.update(b"\x1f")
+            digest.update(str(message.get("content") or message.get("text") or "").encode())
+        return digest.hexdigest()
+
+    def _build_payload(
+        self, model: str | None, messages: Sequence[dict[str, str]]
+    ) -> dict[str, Any]:
+        payload = {**self._base_payload, "messages": self._format_messages(messages)}
+        if model:
+            payload["model"] = model
+        return payload
+
     def _fallback_response(self) -> str:
         """Fallback ответ при недоступности LLM."""
         return (
@@ -83,14 +137,7 @@ class AmveraLLMClient:
 
     async def _do_chat(self, *, model: str | None = None, messages: Sequence[dict[str, str]]) -> str:
         """Внутренний метод выполнения запроса к LLM."""
-        headers = {"X-Auth-Token": f"Bearer {self._api_token}"}
-        payload = {
-            "model": model or self._model,
-            "messages": self._format_messages(messages),
-            "temperature": self._temperature,
-            "max_tokens": self._max_tokens,
-        }
-        url = f"{self._api_url}/models/{self._inference_name}"
+        body = orjson.dumps(self._build_payload(model, messages))
 
         async for attempt in AsyncRetrying(
             reraise=True,
@@ -100,9 +147,10 @@ class AmveraLLMClient:
         ):
             with attempt:
                 try:
-                    response = await self._client.post(url, json=payload, headers=headers)
+                    async with self._semaphore:
+                        response = await self._client.post(self._url, content=body)
                     response.raise_for_status()
-                    data = response.json()
+                    data = orjson.loads(response.content)
                     content = self._extract_text(data)
                     if content:
                         return content
@@ -145,6 +193,9 @@ class AmveraLLMClient:
     ) -> AsyncIterator[str]:
         """
         Streaming версия для быстрого первого токена.
+
+        Ошибки провайдера поднимаются как HTTPException(502), как и в chat(),
+        чтобы вызывающий код мог переключиться на ответ без LLM.
         
         Yields:
             Части ответа по мере их генерации
@@ -154,18 +205,13 @@ class AmveraLLMClient:
             yield "[LLM отключён: режим dry-run]"
             return
 
-        headers = {"X-Auth-Token": f"Bearer {self._api_token}"}
-        payload = {
-            "model": model or self._model,
-            "messages": self._format_messages(messages),
-            "temperature": self._temperature,
-            "max_tokens": self._max_tokens,
-            "stream": True,
-        }
-        url = f"{self._api_url}/models/{self._inference_name}"
+        payload = self._build_payload(model, messages)
+        payload["stream"] = True
 
         try:
-            async with self._client.stream("POST", url, json=payload, headers=headers) as response:
+            async with self._semaphore, self._client.stream(
+                "POST", self._url, content=orjson.dumps(payload)
+            ) as response:
                 response.raise_for_status()
                 async for line in response.aiter_lines():
                     if not line:
@@ -175,18 +221,18 @@ class AmveraLLMClient:
                         if data == "[DONE]":
                             break
                         try:
-                            chunk = json.loads(data)
+                            chunk = orjson.loads(data)
                             choices = chunk.get("choices", [])
                             if choices:
                                 delta = choices[0].get("delta", {})
                                 content = delta.get("content") or delta.get("text", "")
                                 if content:
                                     yield content
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             continue
         except httpx.HTTPError as exc:
             self._logger.error("Streaming request failed: %s", exc)
-            yield self._fallback_response()
+            raise HTTPException(status_code=502, detail="LLM provider unreachable") from exc
 
     @staticmethod
     def _extract_text(data: dict[str, Any]) -> str:
@@ -7,21 +7,23 @@
 
 from __future__ import annotations
 
-import asyncio
 import hashlib
 import json
 import logging
 import time
-from collections import OrderedDict
-from typing import Any
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable
 
 from app.session.redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
 def _normalize_query(query: str) -> str:
-    """Нормализует запрос для кэширования."""
+    """Нормализует запрос для кэширования (частые фразы повторяются)."""
     normalized = query.strip().lower()
     return " ".join(normalized.split())
 
@@ -29,15 +31,24 @@ def _normalize_query(query: str) -> str:
 def _make_cache_key(
     query: str, intent: str, context: str, *, context_hash_length: int
 ) -> str:
-    """Создаёт общий ключ для разных реализаций кэша."""
-    normalized_query = _normalize_query(query)
-    context_snippet = context[:context_hash_length] if context else ""
-    context_hash = hashlib.md5(
-        context_snippet.encode(), usedforsecurity=False
-    ).hexdigest()[:12]
+    """Создаёт общий ключ для разных реализаций кэша (один проход BLAKE2b)."""
+    digest = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+    digest.update(_normalize_query(query).encode())
+    digest.update(b"\x1f")
+    digest.update(intent.encode())
+    digest.update(b"\x1f")
+    if context:
+        digest.update(context[:context_hash_length].encode())
+    return digest.hexdigest()
 
-    key_string = f"{normalized_query}|{intent}|{context_hash}"
-    return hashlib.sha256(key_string.encode()).hexdigest()[:32]
+
+@dataclass(slots=True)
+class _Entry:
+    """Запись in-memory кэша (slots: меньше памяти, быстрый доступ к полям)."""
+
+    answer: str
+    ts: float
+    debug: dict[str, Any]
 
 
 class LLMCache:
@@ -55,17 +66,28 @@ class LLMCache:
         max_size: int = 512,
         ttl_seconds: float = 600.0,
         context_hash_length: int = 500,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
-        self._cache: OrderedDict[str, tuple[str, float, dict[str, Any]]] = OrderedDict()
+        # Обычный dict хранит порядок вставки — этого достаточно для LRU.
+        # Блокировка не нужна: операции ниже не содержат await и в
+        # однопоточном event loop выполняются атомарно.
+        self._cache: dict[str, _Entry] = {}
         self._max_size = max_size
+        # Для маленьких кэшей (< 16 записей) запаса нет — лимит строгий
+        self._slack = max_size // 16
         self._ttl = ttl_seconds
         self._context_hash_length = context_hash_length
-        self._lock = asyncio.Lock()
+        # Монотонные часы: TTL не ломается при переводе системного времени
+        self._clock = clock
         self._hits = 0
         self._misses = 0
 
-    def _make_key(self, query: str, intent: str, context: str) -> str:
-        """Создаёт ключ кэша."""
+    def make_key(self, query: str, intent: str, context: str = "") -> str:
+        """
+        Создаёт ключ кэша.
+
+        Ключ можно посчитать один раз и передать в get() и set() через key=.
+        """
         return _make_cache_key(
             query, intent, context, context_hash_length=self._context_hash_length
         )
@@ -75,36 +97,40 @@ class LLMCache:
         query: str,
         intent: str,
         context: str = "",
+        *,
+        key: str | None = None,
     ) -> tuple[str | None, dict[str, Any] | None]:
         """
         Получает кэшированный ответ.
         
+        Args:
+            key: Готовый ключ из make_key() (чтобы не считать его повторно)
+
         Returns:
             Tuple из (answer, debug_info) или (None, None) если не найдено
         """
-        key = self._make_key(query, intent, context)
+        if key is None:
+            key = self.make_key(query, intent, context)
         
-        async with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                return None, None
-            
-            answer, ts, debug_info = self._cache[key]
-            if time.time() - ts > self._ttl:
-                del self._cache[key]
-                self._misses += 1
-                return None, None
-            
-            # Обновляем позицию (LRU)
-            self._cache.move_to_end(key)
-            self._hits += 1
-            
-            logger.debug(
-                "LLM cache hit for query: %s (hits=%d, misses=%d)",
-                query[:50], self._hits, self._misses
-            )
-            
-            return answer, debug_info
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            self._misses += 1
+            return None, None
+        
+        if self._clock() - entry.ts > self._ttl:
+            self._misses += 1
+            return None, None
+        
+        # Возвращаем запись в конец (LRU)
+        self._cache[key] = entry
+        self._hits += 1
+        
+        logger.debug(
+            "LLM cache hit for query: %s (hits=%d, misses=%d)",
+            query[:50], self._hits, self._misses
+        )
+        
+        return entry.answer, entry.debug
 
     async def set(
         self,
@@ -113,6 +139,8 @@ class LLMCache:
         context: str,
         answer: str,
         debug_info: dict[str, Any] | None = None,
+        *,
+        key: str | None = None,
     ) -> None:
         """
         Сохраняет ответ в кэш.
@@ -123,35 +151,34 @@ class LLMCache:
             context: RAG контекст
             answer: Ответ LLM
             debug_info: Отладочная информация (опционально)
+            key: Готовый ключ из make_key() (опционально)
         """
-        key = self._make_key(query, intent, context)
+        if key is None:
+            key = self.make_key(query, intent, context)
+        
+        self._cache.pop(key, None)
+        self._cache[key] = _Entry(answer, self._clock(), debug_info or {})
         
-        async with self._lock:
-            self._cache[key] = (answer, time.time(), debug_info or {})
-            self._cache.move_to_end(key)
-            
-            # Удаляем старые записи если превышен лимит
-            while len(self._cache) > self._max_size:
-                self._cache.popitem(last=False)
+        # Удаляем старые записи если превышен лимит
+        # Вытесняем пачкой: пока кэш не перерос лимит на _slack, set() не
+        # трогает старые записи, а затем убирает все лишние за один проход.
+        if len(self._cache) > self._max_size + self._slack:
+            excess = len(self._cache) - self._max_size
+            for stale in list(islice(self._cache, excess)):
+                del self._cache[stale]
 
     async def invalidate(self, query: str, intent: str, context: str = "") -> bool:
         """Удаляет запись из кэша."""
-        key = self._make_key(query, intent, context)
-        
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        key = self.make_key(query, intent, context)
+        return self._cache.pop(key, None) is not None
 
     async def clear(self) -> int:
         """Очищает весь кэш. Возвращает количество удалённых записей."""
-        async with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            self._hits = 0
-            self._misses = 0
-            return count
+        count = len(self._cache)
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+        return count
 
     def stats(self) -> dict[str, Any]:
         """Возвращает статистику кэша."""
@@ -181,12 +208,11 @@ class RedisLLMCache:
         self._ttl = ttl_seconds
         self._context_hash_length = context_hash_length
         self._prefix = prefix
-        self._lock = asyncio.Lock()
         self._hits = 0
         self._misses = 0
         self._known_keys: set[str] = set()
 
-    def _make_key(self, query: str, intent: str, context: str) -> str:
+    def make_key(self, query: str, intent: str, context: str = "") -> str:
         return _make_cache_key(
             query, intent, context, context_hash_length=self._context_hash_length
         )
@@ -195,36 +221,40 @@ class RedisLLMCache:
         return f"{self._prefix}{cache_key}"
 
     async def get(
-        self, query: str, intent: str, context: str = ""
+        self,
+        query: str,
+        intent: str,
+        context: str = "",
+        *,
+        key: str | None = None,
     ) -> tuple[str | None, dict[str, Any] | None]:
-        cache_key = self._make_key(query, intent, context)
+        cache_key = key if key is not None else self.make_key(query, intent, context)
         redis_key = self._redis_key(cache_key)
 
-        async with self._lock:
-            try:
-                raw = await self._redis.get(redis_key)
-            except Exception as exc:  # pragma: no cover - network errors
-                logger.warning("Redis LLM cache get failed: %s", exc)
-                self._misses += 1
-                return None, None
-
-            if not raw:
-                self._misses += 1
-                return None, None
-
-            try:
-                decoded = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else str(raw)
-                payload = json.loads(decoded)
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.warning("Failed to decode Redis LLM cache entry: %s", exc)
-                self._misses += 1
-                return None, None
-
-            answer = payload.get("answer")
-            debug_info = payload.get("debug_info") or {}
-            self._hits += 1
-            self._known_keys.add(redis_key)
-            return answer, debug_info
+        try:
+            raw = await self._redis.get(redis_key)
+        except Exception as exc:  # pragma: no cover - network errors
+            logger.warning("Redis LLM cache get failed: %s", exc)
+            self._misses += 1
+            return None, None
+
+        if not raw:
+            self._misses += 1
+            return None, None
+
+        try:
+            decoded = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else str(raw)
+            payload = json.loads(decoded)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Failed to decode Redis LLM cache entry: %s", exc)
+            self._misses += 1
+            return None, None
+
+        answer = payload.get("answer")
+        debug_info = payload.get("debug_info") or {}
+        self._hits += 1
+        self._known_keys.add(redis_key)
+        return answer, debug_info
 
     async def set(
         self,
@@ -233,44 +263,43 @@ class RedisLLMCache:
         context: str,
         answer: str,
         debug_info: dict[str, Any] | None = None,
+        *,
+        key: str | None = None,
     ) -> None:
-        cache_key = self._make_key(query, intent, context)
+        cache_key = key if key is not None else self.make_key(query, intent, context)
         redis_key = self._redis_key(cache_key)
         payload = json.dumps(
             {"answer": answer, "debug_info": debug_info or {}}, ensure_ascii=False
         )
-        async with self._lock:
-            try:
-                await self._redis.setex(redis_key, int(self._ttl), payload)
-                self._known_keys.add(redis_key)
-            except Exception as exc:  # pragma: no cover - best effort
-                logger.warning("Redis LLM cache set failed: %s", exc)
+        try:
+            await self._redis.setex(redis_key, int(self._ttl), payload)
+            self._known_keys.add(redis_key)
+        except Exception as exc:  # pragma: no cover - best effort
+            logger.warning("Redis LLM cache set failed: %s", exc)
 
     async def invalidate(self, query: str, intent: str, context: str = "") -> bool:
-        cache_key = self._make_key(query, intent, context)
+        cache_key = self.make_key(query, intent, context)
         redis_key = self._redis_key(cache_key)
-        async with self._lock:
-            try:
-                deleted = await self._redis.delete(redis_key)
-            except Exception as exc:  # pragma: no cover
-                logger.warning("Redis LLM cache invalidate failed: %s", exc)
-                return False
-            self._known_keys.discard(redis_key)
-            return bool(deleted)
+        try:
+            deleted = await self._redis.delete(redis_key)
+        except Exception as exc:  # pragma: no cover
+            logger.warning("Redis LLM cache invalidate failed: %s", exc)
+            return False
+        self._known_keys.discard(redis_key)
+        return bool(deleted)
 
     async def clear(self) -> int:
         """Очищает все записи с заданным префиксом."""
         removed = 0
-        async with self._lock:
-            try:
-                async for key in self._redis.scan_iter(match=f"{self._prefix}*"):
-                    removed += 1
-                    await self._redis.delete(key)
-            except Exception as exc:  # pragma: no cover - best effort
-                logger.warning("Redis LLM cache clear failed: %s", exc)
-            self._known_keys.clear()
-            self._hits = 0
-            self._misses = 0
+        try:
+            async for key in self._redis.scan_iter(match=f"{self._prefix}*"):
+                removed += 1
+                await self._redis.delete(key)
+        except Exception as exc:  # pragma: no cover - best effort
+            logger.warning("Redis LLM cache clear failed: %s", exc)
+        self._known_keys.clear()
+        self._hits = 0
+        self._misses = 0
         return removed
 
     def stats(self) -> dict[str, Any]:
@@ -286,18 +315,70 @@ class RedisLLMCache:
         }
 
 
+class _NullLLMCache:
+    """
+    Заглушка при LLM_CACHE_ENABLED=false.
+
+    Ничего не хранит и не хэширует запросы — все методы сразу возвращают
+    пустой результат, поэтому вызывающему коду не нужны отдельные проверки.
+    """
+
+    def make_key(self, query: str, intent: str, context: str = "") -> str:
+        return ""
+
+    async def get(
+        self,
+        query: str,
+        intent: str,
+        context: str = "",
+        *,
+        key: str | None = None,
+    ) -> tuple[str | None, dict[str, Any] | None]:
+        return None, None
+
+    async def set(
+        self,
+        query: str,
+        intent: str,
+        context: str,
+        answer: str,
+        debug_info: dict[str, Any] | None = None,
+        *,
+        key: str | None = None,
+    ) -> None:
+        return None
+
+    async def invalidate(self, query: str, intent: str, context: str = "") -> bool:
+        return False
+
+    async def clear(self) -> int:
+        return 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": 0,
+            "max_size": 0,
+            "hits": 0,
+            "misses": 0,
+            "hit_rate_percent": 0.0,
+            "ttl_seconds": 0.0,
+        }
+
+
 # === Singleton ===
 
-_LLM_CACHE: LLMCache | RedisLLMCache | None = None
+_LLM_CACHE: LLMCache | RedisLLMCache | _NullLLMCache | None = None
 
 
-def get_llm_cache() -> LLMCache | RedisLLMCache:
-    """Возвращает singleton экземпляр LLM кэша."""
+def get_llm_cache() -> LLMCache | RedisLLMCache | _NullLLMCache:
+    """Возвращает singleton экземпляр LLM кэша (заглушку, если кэш выключен)."""
     global _LLM_CACHE
     if _LLM_CACHE is None:
         from app.core.config import get_settings
         settings = get_settings()
-        if settings.use_redis_cache:
+        if not settings.llm_cache_enabled:
+            _LLM_CACHE = _NullLLMCache()
+        elif settings.use_redis_cache:
             try:
                 _LLM_CACHE = RedisLLMCache(
                     ttl_seconds=settings.llm_cache_ttl,
@@ -8,6 +8,7 @@ from contextlib import suppress
 
 from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -21,7 +22,7 @@ from app.core.logging import setup_logging
 from app.db.pool import get_pool
 from app.llm.amvera_client import AmveraLLMClient
 from app.rag.embed_client import close_embed_client, get_embed_client
-from app.rag.qdrant_client import get_qdrant_client
+from app.rag.qdrant_client import QdrantClient, get_qdrant_client
 from app.session import get_session_store
 from app.session.redis_state_store import get_redis_state_store, close_redis_state_store
 
@@ -52,13 +53,9 @@ else:
     logger.info("Using in-memory state store for conversation state")
 
 slot_filler = SlotFiller()
-qdrant_client = get_qdrant_client()
-llm_client = AmveraLLMClient()
-shelter_service = ShelterCloudService()
-booking_service = BookingQuoteService(shelter_service)
 
 
-async def _warmup_connections() -> None:
+async def _warmup_connections(qdrant_client: QdrantClient) -> None:
     """Прогрев соединений и health check при старте."""
     logger.info("Warming up connections and health checks...")
     
@@ -73,7 +70,7 @@ async def _warmup_connections() -> None:
         """Прогрев embed клиента."""
         try:
             embed_client = get_embed_client()
-            await embed_client.embed(["warmup test"])
+            await embed_client.embed(["warmup test"], use_cache=False)
             health_status["embed"] = True
             logger.info("✓ Embed client ready")
         except Exception as exc:
@@ -143,6 +140,15 @@ async def lifespan(app: FastAPI):
     pool = await get_pool()
     warmup_task: asyncio.Task | None = None
 
+    # HTTP-клиенты создаются при старте приложения, а не при импорте модуля:
+    # импорт остаётся дешёвым, а клиенты живут ровно столько, сколько app.
+    qdrant_client = get_qdrant_client()
+    llm_client = AmveraLLMClient()
+    shelter_service = ShelterCloudService()
+    app.state.qdrant_client = qdrant_client
+    app.state.llm_client = llm_client
+    app.state.booking_service = BookingQuoteService(shelter_service)
+
     # Прогрев соединений (в фоне, если включено)
     if settings.enable_startup_warmup:
         def _log_warmup_result(task: asyncio.Task) -> None:
@@ -152,7 +158,7 @@ async def lifespan(app: FastAPI):
             if exc:
                 logger.error("Warmup task failed: %s", exc)
 
-        warmup_task = asyncio.create_task(_warmup_connections())
+        warmup_task = asyncio.create_task(_warmup_connections(qdrant_client))
         warmup_task.add_done_callback(_log_warmup_result)
     else:
         logger.info("Startup warmup is disabled via configuration")
@@ -178,13 +184,14 @@ async def lifespan(app: FastAPI):
             logger.info("Redis state store closed")
 
 
-def composer_dependency(pool=Depends(get_pool)) -> ChatComposer:
+def composer_dependency(request: Request, pool=Depends(get_pool)) -> ChatComposer:
+    state = request.app.state
     return ChatComposer(
         pool=pool,
-        qdrant=qdrant_client,
-        llm=llm_client,
+        qdrant=state.qdrant_client,
+        llm=state.llm_client,
         slot_filler=slot_filler,
-        booking_service=booking_service,
+        booking_service=state.booking_service,
         store=state_store,
         booking_fsm_store=booking_state_store,
         settings=settings,
@@ -242,7 +249,11 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="U4S Chat API", lifespan=lifespan)
+    app = FastAPI(
+        title="U4S Chat API",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
     api_prefix = settings.api_prefix
 
     # Настройка CORS
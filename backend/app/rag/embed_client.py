@@ -11,49 +11,82 @@ import asyncio
 import hashlib
 import logging
 import time
-from collections import OrderedDict
-from typing import Any
+from array import array
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Sequence
 
 import httpx
+import orjson
 
 from app.core.config import get_settings
 from app.core.circuit_breaker import get_circuit_breaker, CircuitBreakerOpenError
+from app.core.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Ответы крупнее этого порога (пакет из нескольких векторов по 768 чисел)
+# разбираются в отдельном потоке, чтобы не блокировать event loop.
+_OFFLOAD_PARSE_BYTES = 64 * 1024
+
+# Вектор эмбеддинга. Клиент отдаёт array('f'): 4 байта на число вместо
+# ~32 у float в списке — кэш из сотен векторов по 768 чисел в разы меньше.
+Vector = Sequence[float]
+
 
 class EmbedCache:
-    """Простой TTL-кэш для эмбеддингов."""
+    """
+    TTL/LRU-кэш эмбеддингов по отдельным текстам.
+
+    Запрос из нескольких текстов может частично попасть в кэш — в сервис
+    уходят только недостающие тексты.
+    """
 
-    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0) -> None:
-        self._cache: OrderedDict[str, tuple[list[list[float]], float]] = OrderedDict()
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # dict хранит порядок вставки; блокировка не нужна — внутри нет await
+        self._cache: dict[str, tuple[Vector, float]] = {}
         self._max_size = max_size
+        # Для маленьких кэшей (< 16 записей) запаса нет — лимит строгий
+        self._slack = max_size // 16
         self._ttl = ttl_seconds
-        self._lock = asyncio.Lock()
-
-    def _make_key(self, texts: list[str]) -> str:
-        normalized = "|".join(t.strip().lower() for t in texts)
-        return hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()
-
-    async def get(self, texts: list[str]) -> list[list[float]] | None:
-        key = self._make_key(texts)
-        async with self._lock:
-            if key not in self._cache:
-                return None
-            embeddings, ts = self._cache[key]
-            if time.time() - ts > self._ttl:
-                del self._cache[key]
-                return None
-            self._cache.move_to_end(key)
-            return embeddings
+        self._clock = clock
 
-    async def set(self, texts: list[str], embeddings: list[list[float]]) -> None:
-        key = self._make_key(texts)
-        async with self._lock:
-            self._cache[key] = (embeddings, time.time())
-            self._cache.move_to_end(key)
-            while len(self._cache) > self._max_size:
-                self._cache.popitem(last=False)
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Ключ без учёта регистра и лишних пробелов ("Да " и "да" совпадают)."""
+        normalized = " ".join(text.lower().split())
+        return hashlib.blake2b(
+            normalized.encode(), digest_size=16, usedforsecurity=False
+        ).hexdigest()
+
+    async def get(self, text: str, *, key: str | None = None) -> Vector | None:
+        if key is None:
+            key = self.make_key(text)
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        embedding, ts = entry
+        if self._clock() - ts > self._ttl:
+            return None
+        self._cache[key] = entry
+        return embedding
+
+    async def set(self, text: str, embedding: Vector, *, key: str | None = None) -> None:
+        if key is None:
+            key = self.make_key(text)
+        self._cache.pop(key, None)
+        self._cache[key] = (embedding, self._clock())
+        # Вытесняем пачкой: пока кэш не перерос лимит на _slack, set() не
+        # трогает старые записи, а затем убирает все лишние за один проход.
+        if len(self._cache) > self._max_size + self._slack:
+            excess = len(self._cache) - self._max_size
+            for stale in list(islice(self._cache, excess)):
+                del self._cache[stale]
 
 
 class EmbedClient:
@@ -64,8 +97,8 @@ class EmbedClient:
         *,
         base_url: str | None = None,
         timeout: float | None = None,
-        cache_size: int = 256,
-        cache_ttl: float = 300.0,
+        cache_size: int | None = None,
+        cache_ttl: float | None = None,
     ) -> None:
         settings = get_settings()
         self._base_url = base_url or str(settings.embed_url)
@@ -77,26 +110,171 @@ class EmbedClient:
             write=self._timeout,
             pool=self._timeout,
         )
-        self._client = httpx.AsyncClient(timeout=http_timeout)
-        self._cache = EmbedCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        # Клиент живёт весь процесс и вызывается на каждый RAG-запрос:
+        # HTTP/2 и прогретый keep-alive пул убирают повторные рукопожатия.
+        # Accept-Encoding: gzip, deflate httpx отправляет по умолчанию.
+        self._client = httpx.AsyncClient(
+            timeout=http_timeout,
+            headers={"Content-Type": "application/json"},
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self._cache = EmbedCache(
+            max_size=cache_size if cache_size is not None else settings.embed_cache_size,
+            ttl_seconds=cache_ttl if cache_ttl is not None else settings.embed_cache_ttl,
+        )
         self._circuit_breaker = get_circuit_breaker("embed_service")
+        self._single_flight: SingleFlight[tuple[list[Vector], str | None, int]] = SingleFlight()
+        # Микро-батчинг запросов (embed_batched, embed_one) от разных диалогов
+        self._batch_window = max(0.0, settings.embed_batch_window_ms) / 1000
+        self._batch_max_size = max(1, settings.embed_batch_max_size)
+        self._pending: list[tuple[str, asyncio.Future[tuple[Vector, str | None]]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batch_tasks: set[asyncio.Task[None]] = set()
 
     async def close(self) -> None:
         await self._client.aclose()
 
-    async def embed(self, texts: list[str]) -> tuple[list[list[float]], str | None, int]:
+    async def embed_one(self, text: str) -> Vector:
+        """Возвращает эмбеддинг одного текста (пустой вектор при ошибке)."""
+        embeddings, _, _ = await self.embed_batched([text])
+        return embeddings[0] if embeddings else []
+
+    async def embed_batched(self, texts: list[str]) -> tuple[list[Vector], str | None, int]:
+        """
+        То же, что embed(), но промахи кэша собираются в общий пакет.
+
+        При EMBED_BATCH_WINDOW_MS > 0 тексты из одновременных диалогов,
+        пришедшие в пределах окна, уходят в эмбеддинг-сервис одним POST.
+        """
+        if self._batch_window <= 0:
+            return await self.embed(texts)
+        if not texts:
+            return [], None, 0
+
+        keys = [self._cache.make_key(text) for text in texts]
+        cached = [await self._cache.get(text, key=key) for text, key in zip(texts, keys)]
+        loop = asyncio.get_running_loop()
+        futures: dict[str, asyncio.Future[tuple[Vector, str | None]]] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None and key not in futures:
+                futures[key] = self._enqueue(text, loop)
+        if not futures:
+            return cached, None, 0
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*futures.values())
+        latency_ms = int((time.perf_counter() - started) * 1000)
+
+        by_key: dict[str, Vector] = {}
+        for key, (vector, error) in zip(futures, results):
+            if error:
+                return [], error, latency_ms
+            by_key[key] = vector
+        return [
+            vector if vector is not None else by_key[key]
+            for key, vector in zip(keys, cached)
+        ], None, latency_ms
+
+    def _enqueue(
+        self, text: str, loop: asyncio.AbstractEventLoop
+    ) -> asyncio.Future[tuple[Vector, str | None]]:
+        """Ставит текст в текущий пакет; пакет уходит по окну или по размеру."""
+        future: asyncio.Future[tuple[Vector, str | None]] = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self._batch_max_size:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush_pending)
+        return future
+
+    def _flush_pending(self) -> None:
+        """Отправляет накопленные запросы одним пакетом в фоновой задаче."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(
+        self, batch: list[tuple[str, asyncio.Future[tuple[Vector, str | None]]]]
+    ) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings, error, _ = await self.embed(texts)
+        except Exception as exc:
+            logger.warning("Batched embedding request failed: %s", exc)
+            embeddings, error = [], str(exc)
+
+        by_text: dict[str, Vector] = {}
+        if not error:
+            by_text = dict(zip(texts, embeddings))
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result((by_text.get(text, []), error))
+
+    async def embed(
+        self, texts: list[str], *, use_cache: bool = True
+    ) -> tuple[list[Vector], str | None, int]:
         """
         Возвращает (embeddings, error, latency_ms).
         Использует кэш для повторных запросов и circuit breaker для защиты.
+        Векторы возвращаются как array('f') (float32).
+
+        use_cache=False всегда обращается к сервису (health check, прогрев):
+        ответ из кэша не говорит о том, что сервис сейчас доступен.
         """
         if not texts:
             return [], None, 0
 
-        cached = await self._cache.get(texts)
-        if cached is not None:
+        keys = [self._cache.make_key(text) for text in texts]
+        if not use_cache:
+            return await self._embed_uncached(list(texts), keys)
+
+        cached = [await self._cache.get(text, key=key) for text, key in zip(texts, keys)]
+        # Промахи без повторов: в сервис уходят только недостающие тексты
+        missing: dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None:
+                missing.setdefault(key, text)
+        if not missing:
             logger.debug("Embed cache hit for %d texts", len(texts))
             return cached, None, 0
 
+        # Одновременные промахи по одним и тем же текстам ждут один HTTP-запрос
+        missing_keys = list(missing)
+        fetched, error, latency_ms = await self._single_flight.do(
+            "\x1f".join(missing_keys),
+            partial(self._embed_uncached, list(missing.values()), missing_keys),
+        )
+        if error:
+            return [], error, latency_ms
+        if len(fetched) != len(missing_keys):
+            logger.warning(
+                "Embedding count mismatch: %d texts, %d vectors",
+                len(missing_keys),
+                len(fetched),
+            )
+            return [], "count_mismatch", latency_ms
+
+        by_key = dict(zip(missing_keys, fetched))
+        return [
+            vector if vector is not None else by_key[key]
+            for key, vector in zip(keys, cached)
+        ], None, latency_ms
+
+    async def _embed_uncached(
+        self, texts: list[str], keys: list[str]
+    ) -> tuple[list[Vector], str | None, int]:
         started = time.perf_counter()
 
         # Используем circuit breaker
@@ -104,6 +282,7 @@ class EmbedClient:
             result = await self._circuit_breaker.call(
                 self._do_embed,
                 texts,
+                keys,
                 fallback=lambda: ([], "circuit_breaker_open", 0),
             )
             return result
@@ -112,18 +291,28 @@ class EmbedClient:
             logger.warning("Embed circuit breaker is open")
             return [], "circuit_breaker_open", latency_ms
 
-    async def _do_embed(self, texts: list[str]) -> tuple[list[list[float]], str | None, int]:
+    async def _do_embed(
+        self, texts: list[str], keys: list[str]
+    ) -> tuple[list[Vector], str | None, int]:
         """Внутренний метод для выполнения запроса эмбеддингов."""
         started = time.perf_counter()
 
         try:
-            response = await self._client.post(self._base_url, json={"texts": list(texts)})
+            response = await self._client.post(
+                self._base_url, content=orjson.dumps({"texts": texts})
+            )
             response.raise_for_status()
-            data = response.json()
         except httpx.HTTPError as exc:
             latency_ms = int((time.perf_counter() - started) * 1000)
             logger.error("Embedding request failed: %s", exc, extra={"embed_error": str(exc)})
             raise  # Пробрасываем для circuit breaker
+
+        content = response.content
+        try:
+            if len(content) > _OFFLOAD_PARSE_BYTES:
+                embeddings, error = await asyncio.to_thread(self._decode_response, content)
+            else:
+                embeddings, error = self._decode_response(content)
         except ValueError as exc:
             latency_ms = int((time.perf_counter() - started) * 1000)
             logger.error("Failed to parse embedding response: %s", exc, extra={"embed_error": str(exc)})
@@ -131,30 +320,51 @@ class EmbedClient:
 
         latency_ms = int((time.perf_counter() - started) * 1000)
 
-        embeddings, error = self._parse_response(data)
         if error:
             return [], error, latency_ms
 
-        if embeddings:
-            await self._cache.set(texts, embeddings)
+        vectors: list[Vector] = [
+            vector if isinstance(vector, array) else array("f", vector)
+            for vector in embeddings
+        ]
+        if len(vectors) == len(texts):
+            for text, key, vector in zip(texts, keys, vectors):
+                await self._cache.set(text, vector, key=key)
 
-        return embeddings, None, latency_ms
+        return vectors, None, latency_ms
 
-    def _parse_response(self, data: Any) -> tuple[list[list[float]], str | None]:
-        embeddings: list[list[float]] = []
+    def _decode_response(self, content: bytes) -> tuple[list[Vector], str | None]:
+        """Декодирует JSON и извлекает векторы (чисто CPU, без обращения к loop)."""
+        return self._parse_response(orjson.loads(content))
+
+    @staticmethod
+    def _fast_vectors(data: dict[str, Any]) -> list[Vector]:
+        """
+        Быстрый путь для типового ответа {"vectors": [[...], ...]}.
+
+        array('f', ...) сам проверяет, что все элементы — числа, поэтому
+        не нужен поэлементный isinstance. Для любой другой формы ответа
+        возвращает пустой список, и разбор идёт через _extract_embeddings.
+        """
+        for key in ("vectors", "embeddings"):
+            value = data.get(key)
+            if isinstance(value, list) and value:
+                try:
+                    vectors: list[Vector] = [array("f", item) for item in value]
+                except (TypeError, ValueError, OverflowError):
+                    return []
+                return vectors if all(vectors) else []
+        return []
+
+    def _parse_response(self, data: Any) -> tuple[list[Vector], str | None]:
+        embeddings: list[Vector] = []
         expected_dim: int | None = None
 
         if isinstance(data, dict):
             dim = data.get("dim")
             if isinstance(dim, int) and dim > 0:
                 expected_dim = dim
-
-            vectors = data.get("vectors")
-            if isinstance(vectors, list):
-                for item in vectors:
-                    vector = self._normalize_vector(item)
-                    if vector:
-                        embeddings.append(vector)
+            embeddings = self._fast_vectors(data)
 
         if not embeddings:
             embeddings = self._extract_embeddings(data)
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+from array import array
 from typing import Any, Iterable
 
 import httpx
+import orjson
 from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.core.config import get_settings
 
 
+def _vector_to_list(vector: Iterable[float]) -> list[float]:
+    """
+    Переводит вектор в список только на границе сериализации.
+
+    Эмбеддинги живут как array('f'); array.tolist() строит список
+    одним вызовом на C, без поэлементной итерации list(vector).
+    """
+    if isinstance(vector, array):
+        return vector.tolist()
+    return list(vector)
+
+
 class QdrantClient:
     """Минимальный клиент Qdrant для поиска ближайших точек."""
 
@@ -16,13 +30,27 @@ class QdrantClient:
         self._base_url = base_url or str(settings.qdrant_url).rstrip("/")
         self._timeout = timeout
         
-        # Формируем заголовки: добавляем api-key если задан
-        headers: dict[str, str] = {}
+        # Формируем заголовки: тела запросов сериализует orjson (bytes), поэтому
+        # Content-Type задаём явно; добавляем api-key если задан
+        headers: dict[str, str] = {"Content-Type": "application/json"}
         qdrant_api_key = api_key or settings.qdrant_api_key
         if qdrant_api_key:
             headers["api-key"] = qdrant_api_key
         
-        self._client = httpx.AsyncClient(timeout=timeout, headers=headers)
+        # Держим прогретый пул соединений: поиск идёт на каждый вопрос,
+        # а новое TLS-соединение к Qdrant Cloud стоит дороже самого поиска.
+        # HTTP/2 согласуется через ALPN (при http:// остаётся HTTP/1.1) и
+        # позволяет параллельным поискам идти по одному соединению.
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            headers=headers,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=32,
+                keepalive_expiry=30.0,
+            ),
+        )
 
     async def close(self) -> None:
         await self._client.aclose()
@@ -37,7 +65,7 @@ class QdrantClient:
     ) -> list[dict[str, Any]]:
         url = f"{self._base_url}/collections/{collection}/points/search"
         payload: dict[str, Any] = {
-            "vector": list(vector),
+            "vector": _vector_to_list(vector),
             "limit": limit,
             "with_payload": True,
         }
@@ -51,9 +79,9 @@ class QdrantClient:
             retry=retry_if_exception_type(httpx.HTTPError),
         ):
             with attempt:
-                response = await self._client.post(url, json=payload)
+                response = await self._client.post(url, content=orjson.dumps(payload))
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
                 if not isinstance(data, dict):
                     return []
                 result = data.get("result") or []
@@ -62,6 +90,57 @@ class QdrantClient:
                 return []
         return []
 
+    async def search_batch(
+        self,
+        *,
+        collection: str,
+        vectors: Iterable[Iterable[float]],
+        limit: int = 5,
+        query_filter: dict[str, Any] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Несколько поисков одним запросом (points/search/batch).
+
+        Возвращает списки точек в том же порядке, что и vectors.
+        """
+        url = f"{self._base_url}/collections/{collection}/points/search/batch"
+        searches: list[dict[str, Any]] = []
+        for vector in vectors:
+            search: dict[str, Any] = {
+                "vector": _vector_to_list(vector),
+                "limit": limit,
+                "with_payload": True,
+            }
+            if query_filter:
+                search["filter"] = query_filter
+            searches.append(search)
+        if not searches:
+            return []
+
+        async for attempt in AsyncRetrying(
+            reraise=True,
+            stop=stop_after_attempt(2),
+            wait=wait_exponential(multiplier=0.3, min=0.3, max=1.5),
+            retry=retry_if_exception_type(httpx.HTTPError),
+        ):
+            with attempt:
+                response = await self._client.post(
+                    url, content=orjson.dumps({"searches": searches})
+                )
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+                result = data.get("result") if isinstance(data, dict) else None
+                if not isinstance(result, list):
+                    return [[] for _ in searches]
+                batches: list[list[dict[str, Any]]] = []
+                for points in result:
+                    if isinstance(points, list):
+                        batches.append([item for item in points if isinstance(item, dict)])
+                    else:
+                        batches.append([])
+                return batches
+        return []
+
     async def scroll(
         self,
         *,
@@ -78,9 +157,9 @@ class QdrantClient:
             retry=retry_if_exception_type(httpx.HTTPError),
         ):
             with attempt:
-                response = await self._client.post(url, json=payload)
+                response = await self._client.post(url, content=orjson.dumps(payload))
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
                 if not isinstance(data, dict):
                     return []
                 result = data.get("result")
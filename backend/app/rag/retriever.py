@@ -6,13 +6,14 @@ import hashlib
 import logging
 import time
 from collections import OrderedDict
-from typing import Any, Iterable
+from functools import lru_cache
+from typing import Any, Callable, Iterable
 
 import asyncpg
 
 from app.core.config import get_settings
 from app.db.queries.faq import search_faq
-from app.rag.embed_client import get_embed_client
+from app.rag.embed_client import Vector, get_embed_client
 from app.rag.qdrant_client import QdrantClient
 from app.session.redis_client import get_redis_client
 
@@ -23,10 +24,17 @@ logger = logging.getLogger(__name__)
 class RAGCache:
     """Простой TTL-кэш для результатов RAG-поиска."""
 
-    def __init__(self, max_size: int = 128, ttl_seconds: float = 120.0) -> None:
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl_seconds: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._cache: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
         self._max_size = max_size
         self._ttl = ttl_seconds
+        # Монотонные часы: TTL не ломается при переводе системного времени
+        self._clock = clock
         self._lock = asyncio.Lock()
 
     def _make_key(self, query: str, intent: str | None) -> str:
@@ -39,7 +47,7 @@ class RAGCache:
             if key not in self._cache:
                 return None
             result, ts = self._cache[key]
-            if time.time() - ts > self._ttl:
+            if self._clock() - ts > self._ttl:
                 del self._cache[key]
                 return None
             self._cache.move_to_end(key)
@@ -48,7 +56,7 @@ class RAGCache:
     async def set(self, query: str, intent: str | None, result: dict[str, Any]) -> None:
         key = self._make_key(query, intent)
         async with self._lock:
-            self._cache[key] = (result, time.time())
+            self._cache[key] = (result, self._clock())
             self._cache.move_to_end(key)
             while len(self._cache) > self._max_size:
                 self._cache.popitem(last=False)
@@ -111,27 +119,44 @@ def get_rag_cache() -> RAGCache | RedisRAGCache:
     return _RAG_CACHE
 
 
-async def embed_texts(texts: list[str]) -> tuple[list[list[float]], str | None, int]:
-    """Запрашивает embeddings через singleton клиент с кэшированием."""
+async def embed_texts(texts: list[str]) -> tuple[list[Vector], str | None, int]:
+    """
+    Запрашивает embeddings через singleton клиент с кэшированием.
+
+    Промахи кэша от одновременных диалогов объединяются в один POST
+    (см. EMBED_BATCH_WINDOW_MS).
+    """
     client = get_embed_client()
-    return await client.embed(texts)
+    return await client.embed_batched(texts)
 
 
-async def embed_query(text: str) -> list[float]:
-    """Запрашивает embedding у внешнего сервиса."""
-    embeddings, _, _ = await embed_texts([text])
-    return embeddings[0] if embeddings else []
+async def embed_query(text: str) -> Vector:
+    """Запрашивает embedding у внешнего сервиса (с микро-батчингом, если включён)."""
+    return await get_embed_client().embed_one(text)
 
 
 def _build_filter(*, source_prefix: str | None, types: Iterable[str] | None) -> dict[str, Any] | None:
+    # Кортеж вместо произвольного Iterable, чтобы аргументы можно было кэшировать
+    type_key = tuple(item for item in types if item) if types else None
+    return _build_filter_cached(source_prefix, type_key or None)
+
+
+@lru_cache(maxsize=16)
+def _build_filter_cached(
+    source_prefix: str | None, types: tuple[str, ...] | None
+) -> dict[str, Any] | None:
+    """
+    Фильтр Qdrant для пары (source_prefix, types).
+
+    Комбинаций немного (факты, файлы, все), поэтому dict строится один раз
+    и переиспользуется. Результат общий для всех вызовов — не изменять.
+    """
     filters = []
     if source_prefix:
         match_key = "text" if source_prefix.endswith(":") else "value"
         filters.append({"key": "payload.source", "match": {match_key: source_prefix}})
     if types:
-        type_list = [item for item in types if item]
-        if type_list:
-            filters.append({"key": "payload.type", "match": {"any": type_list}})
+        filters.append({"key": "payload.type", "match": {"any": list(types)}})
 
     if not filters:
         return None
@@ -157,47 +182,89 @@ async def qdrant_search(
     )
 
 
-def _extract_text(payload: dict[str, Any]) -> str:
-    for key in ("text", "content", "chunk", "body"):
-        value = payload.get(key)
-        if isinstance(value, str) and value.strip():
-            return value.strip()
-    return ""
+async def qdrant_search_batch(
+    vectors: Iterable[Iterable[float]],
+    *,
+    client: QdrantClient,
+    limit: int = 6,
+    source_prefix: str | None = None,
+    types: Iterable[str] | None = None,
+    collection: str | None = None,
+) -> list[list[dict[str, Any]]]:
+    """Поиск по нескольким векторам одним запросом к Qdrant."""
+    settings = get_settings()
+    query_filter = _build_filter(source_prefix=source_prefix, types=types)
+    return await client.search_batch(
+        collection=collection or settings.qdrant_collection,
+        vectors=vectors,
+        limit=limit,
+        query_filter=query_filter,
+    )
+
+
+_TEXT_KEYS = ("text", "content", "chunk", "body")
 
 
 def _normalize_hit(hit: dict[str, Any]) -> dict[str, Any]:
+    # Один проход по payload: каждое поле читается один раз, сам payload
+    # отдаётся по ссылке без копирования.
     payload = hit.get("payload") or {}
     if not isinstance(payload, dict):
         payload = {}
 
-    text = _extract_text(payload)
-    title = payload.get("title") if isinstance(payload.get("title"), str) else None
-    entity_id = payload.get("entity_id") if isinstance(payload.get("entity_id"), str) else None
-    source = payload.get("source") if isinstance(payload.get("source"), str) else None
-    type_value = payload.get("type") if isinstance(payload.get("type"), str) else None
+    text = ""
+    for key in _TEXT_KEYS:
+        value = payload.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+            if value:
+                text = value
+                break
+
+    title = payload.get("title")
+    entity_id = payload.get("entity_id")
+    source = payload.get("source")
+    type_value = payload.get("type")
 
     return {
-        "score": float(hit.get("score", 0.0) or 0.0),
-        "type": type_value,
-        "title": title,
-        "entity_id": entity_id,
+        "score": float(hit.get("score") or 0.0),
+        "type": type_value if isinstance(type_value, str) else None,
+        "title": title if isinstance(title, str) else None,
+        "entity_id": entity_id if isinstance(entity_id, str) else None,
         "text": text,
-        "source": source,
+        "source": source if isinstance(source, str) else None,
         "payload": payload,
     }
 
 
+# Ключ дедупликации: строка entity_id либо кортеж (title, начало текста).
+# Кортеж хэшируется без склейки строк, и строка с ним совпасть не может.
+DedupKey = str | tuple[str, str]
+
+
 def _deduplicate_hits(
-    hits: list[dict[str, Any]], *, seen: set[str] | None = None
+    hits: Iterable[dict[str, Any]], *, seen: set[DedupKey] | None = None
 ) -> list[dict[str, Any]]:
+    """
+    Отбрасывает повторы за один проход.
+
+    Принимает любой итератор, поэтому нормализацию можно передать
+    генератором — без промежуточного списка.
+    """
     known = seen if seen is not None else set()
     unique: list[dict[str, Any]] = []
     for hit in hits:
-        text = hit.get("text") or ""
-        title = hit.get("title") or ""
-        payload = hit.get("payload") if isinstance(hit.get("payload"), dict) else {}
-        entity_id = payload.get("entity_id") or payload.get("id")
-        key = str(entity_id or f"{title}::{text[:80]}")
+        payload = hit.get("payload")
+        entity_id = (
+            payload.get("entity_id") or payload.get("id")
+            if isinstance(payload, dict)
+            else None
+        )
+        key: DedupKey
+        if entity_id:
+            key = str(entity_id)
+        else:
+            key = (hit.get("title") or "", (hit.get("text") or "")[:80])
         if key in known:
             continue
         known.add(key)
@@ -205,6 +272,26 @@ def _deduplicate_hits(
     return unique
 
 
+def _start_search(
+    vector: Vector,
+    *,
+    client: QdrantClient,
+    limit: int,
+    source_prefix: str,
+) -> asyncio.Task[list[dict[str, Any]]]:
+    """Запускает поиск в Qdrant фоновой задачей; ошибка превращается в []."""
+
+    async def run() -> list[dict[str, Any]]:
+        try:
+            return await qdrant_search(
+                vector, client=client, limit=limit, source_prefix=source_prefix
+            )
+        except Exception:
+            return []
+
+    return asyncio.create_task(run())
+
+
 async def retrieve_context(query: str, *, client: QdrantClient) -> dict[str, list[dict[str, Any]]]:
     settings = get_settings()
     try:
@@ -214,51 +301,51 @@ async def retrieve_context(query: str, *, client: QdrantClient) -> dict[str, lis
     if not vector:
         return {"facts_hits": [], "files_hits": []}
 
+    # Поиск по файлам запускаем сразу, не дожидаясь фактов: если фактов
+    # окажется мало, его результат уже готов, иначе задача отменяется.
+    facts_task = _start_search(
+        vector,
+        client=client,
+        limit=settings.rag_facts_limit,
+        source_prefix="postgres:u4s_chatbot",
+    )
+    files_task = _start_search(
+        vector, client=client, limit=settings.rag_files_limit, source_prefix="file:"
+    )
     try:
-        facts_raw = await qdrant_search(
-            vector,
-            client=client,
-            limit=settings.rag_facts_limit,
-            source_prefix="postgres:u4s_chatbot",
-        )
-    except Exception:
-        facts_raw = []
+        facts_raw = await facts_task
 
-    dedup_keys: set[str] = set()
-    facts_hits = [_normalize_hit(item) for item in facts_raw]
-    facts_hits = _deduplicate_hits(facts_hits, seen=dedup_keys)
+        dedup_keys: set[DedupKey] = set()
+        facts_hits = _deduplicate_hits(
+            (_normalize_hit(item) for item in facts_raw), seen=dedup_keys
+        )
 
-    files_hits: list[dict[str, Any]] = []
-    if len(facts_hits) < settings.rag_min_facts:
-        try:
-            files_raw = await qdrant_search(
-                vector,
-                client=client,
-                limit=settings.rag_files_limit,
-                source_prefix="file:",
+        files_hits: list[dict[str, Any]] = []
+        if len(facts_hits) < settings.rag_min_facts:
+            files_raw = await files_task
+            files_hits = _deduplicate_hits(
+                (_normalize_hit(item) for item in files_raw), seen=dedup_keys
             )
-        except Exception:
-            files_raw = []
-        files_hits = _deduplicate_hits([
-            _normalize_hit(item) for item in files_raw
-        ], seen=dedup_keys)
+    finally:
+        files_task.cancel()
 
     return {"facts_hits": facts_hits, "files_hits": files_hits}
 
 
-async def _safe_qdrant_search(
-    vector: list[float],
+async def _safe_qdrant_search_batch(
+    vectors: list[Vector],
     *,
     client: QdrantClient,
     limit: int,
-) -> list[dict[str, Any]]:
-    """Обёртка для безопасного поиска в Qdrant."""
-    if not vector:
+) -> list[list[dict[str, Any]]]:
+    """Обёртка для безопасного пакетного поиска в Qdrant."""
+    vectors = [vector for vector in vectors if vector]
+    if not vectors:
         return []
     try:
-        return await qdrant_search(vector, client=client, limit=limit)
+        return await qdrant_search_batch(vectors, client=client, limit=limit)
     except Exception as exc:  # pragma: no cover
-        logger.error("Qdrant search failed: %s", exc)
+        logger.error("Qdrant batch search failed: %s", exc)
         return []
 
 
@@ -312,9 +399,20 @@ async def gather_rag_data(
             "домики номера вместимость цена тариф",
         ]
 
+    # FAQ ищется в Postgres и от эмбеддингов не зависит — запускаем сразу,
+    # чтобы он шёл параллельно с запросом к сервису эмбеддингов.
+    faq_task = asyncio.create_task(
+        _safe_faq_search(pool, query, faq_limit, faq_min_similarity)
+    )
+
     queries = [query, *expanded_queries]
-    embeddings, embed_error, embed_latency_ms = await embed_texts(queries)
+    try:
+        embeddings, embed_error, embed_latency_ms = await embed_texts(queries)
+    except BaseException:
+        faq_task.cancel()
+        raise
     if not embeddings:
+        faq_task.cancel()
         return {
             "facts_hits": [],
             "files_hits": [],
@@ -340,20 +438,11 @@ async def gather_rag_data(
         files_limit or settings.rag_files_limit,
     )
 
-    # Параллельный поиск: все Qdrant-запросы + FAQ одновременно
-    qdrant_tasks = [
-        _safe_qdrant_search(vector, client=client, limit=search_limit)
-        for vector in embeddings
-        if vector
-    ]
-    faq_task = _safe_faq_search(pool, query, faq_limit, faq_min_similarity)
-
-    # Запускаем всё параллельно
-    all_results = await asyncio.gather(*qdrant_tasks, faq_task)
-
-    # Разбираем результаты: все кроме последнего — Qdrant, последний — FAQ
-    qdrant_results = all_results[:-1]
-    faq_hits = all_results[-1]
+    # Один пакетный запрос в Qdrant на все векторы + уже запущенный FAQ
+    qdrant_results, faq_hits = await asyncio.gather(
+        _safe_qdrant_search_batch(embeddings, client=client, limit=search_limit),
+        faq_task,
+    )
 
     qdrant_raw: list[dict[str, Any]] = []
     for result in qdrant_results:
@@ -368,8 +457,7 @@ async def gather_rag_data(
     min_score = min(raw_scores) if raw_scores else None
     max_score = max(raw_scores) if raw_scores else None
 
-    normalized_hits = [_normalize_hit(item) for item in qdrant_raw]
-    normalized_hits = _deduplicate_hits(normalized_hits)
+    normalized_hits = _deduplicate_hits(_normalize_hit(item) for item in qdrant_raw)
     merged_hits_count = len(normalized_hits)
 
     boosting_applied = False
@@ -443,26 +531,22 @@ async def search_hits_with_payload(
     if not vector:
         return {"facts": [], "files": []}
 
+    facts_task = _start_search(
+        vector,
+        client=client,
+        limit=settings.rag_facts_limit,
+        source_prefix="postgres:u4s_chatbot",
+    )
+    files_task = _start_search(
+        vector, client=client, limit=settings.rag_files_limit, source_prefix="file:"
+    )
     try:
-        facts_hits = await qdrant_search(
-            vector,
-            client=client,
-            limit=settings.rag_facts_limit,
-            source_prefix="postgres:u4s_chatbot",
-        )
-    except Exception:
-        facts_hits = []
-    files_hits: list[dict[str, Any]] = []
-    if len(facts_hits) < settings.rag_min_facts:
-        try:
-            files_hits = await qdrant_search(
-                vector,
-                client=client,
-                limit=settings.rag_files_limit,
-                source_prefix="file:",
-            )
-        except Exception:
-            files_hits = []
+        facts_hits = await facts_task
+        files_hits: list[dict[str, Any]] = []
+        if len(facts_hits) < settings.rag_min_facts:
+            files_hits = await files_task
+    finally:
+        files_task.cancel()
 
     return {"facts": facts_hits, "files": files_hits}
 
@@ -471,6 +555,7 @@ __all__ = [
     "embed_texts",
     "embed_query",
     "qdrant_search",
+    "qdrant_search_batch",
     "retrieve_context",
     "gather_rag_data",
     "search_hits_with_payload",
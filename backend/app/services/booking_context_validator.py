@@ -10,6 +10,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 from typing import Any, List, Set
 
 from app.booking.fsm import BookingContext, BookingState
@@ -34,6 +35,36 @@ STATES_REQUIRING_STAY_DURATION: Set[BookingState] = frozenset({
     BookingState.CALCULATE,
 })
 
+@lru_cache(maxsize=256)
+def _parse_iso_date(value: str) -> date:
+    """
+    date.fromisoformat с кэшем: одни и те же даты контекста проверяются
+    на каждом шаге диалога. Ошибки формата не кэшируются (ValueError).
+    """
+    return date.fromisoformat(value)
+
+
+# Недостающие для расчёта данные как биты маски. Младший бит — самый
+# ранний шаг FSM: mask & -mask сразу даёт поле, с которого продолжать.
+_MISSING_CHECKIN = 1
+_MISSING_DURATION = 2
+_MISSING_ADULTS = 4
+_MISSING_CHILDREN_AGES = 8
+
+_CALCULATION_ERRORS: tuple[tuple[int, str], ...] = (
+    (_MISSING_CHECKIN, "Дата заезда не указана"),
+    (_MISSING_DURATION, "Количество ночей или дата выезда не указаны"),
+    (_MISSING_ADULTS, "Количество взрослых не указано"),
+    (_MISSING_CHILDREN_AGES, "Возраст детей не указан"),
+)
+
+_CALCULATION_SUGGESTED_STATE: dict[int, BookingState] = {
+    _MISSING_CHECKIN: BookingState.ASK_CHECKIN,
+    _MISSING_DURATION: BookingState.ASK_NIGHTS_OR_CHECKOUT,
+    _MISSING_ADULTS: BookingState.ASK_ADULTS,
+    _MISSING_CHILDREN_AGES: BookingState.ASK_CHILDREN_AGES,
+}
+
 
 @dataclass
 class ValidationResult:
@@ -127,7 +158,7 @@ class BookingContextValidator:
         
         # Проверка формата даты
         try:
-            _checkin_date = date.fromisoformat(context.checkin)
+            _checkin_date = _parse_iso_date(context.checkin)
         except ValueError:
             logger.warning(
                 "Invalid checkin date format: %s", context.checkin
@@ -150,9 +181,9 @@ class BookingContextValidator:
         
         if context.checkout:
             try:
-                checkout_date = date.fromisoformat(context.checkout)
+                checkout_date = _parse_iso_date(context.checkout)
                 if context.checkin:
-                    checkin_date = date.fromisoformat(context.checkin)
+                    checkin_date = _parse_iso_date(context.checkin)
                     if checkout_date > checkin_date:
                         return ValidationResult.ok()
                     return ValidationResult.error(
@@ -170,36 +201,30 @@ class BookingContextValidator:
         # Nights и checkout оба None - это OK для некоторых состояний
         return ValidationResult.ok()
 
-    def _validate_for_calculation(self, context: BookingContext) -> ValidationResult:
-        """Валидирует контекст для расчёта бронирования."""
-        errors: List[str] = []
-        
+    @staticmethod
+    def _missing_for_calculation(context: BookingContext) -> int:
+        """Маска данных, которых не хватает для расчёта (0 — всё есть)."""
+        mask = 0
         if not context.checkin:
-            errors.append("Дата заезда не указана")
-        
+            mask |= _MISSING_CHECKIN
         if context.nights is None and not context.checkout:
-            errors.append("Количество ночей или дата выезда не указаны")
-        
+            mask |= _MISSING_DURATION
         if context.adults is None:
-            errors.append("Количество взрослых не указано")
-        
+            mask |= _MISSING_ADULTS
         if (context.children or 0) > 0 and not context.children_ages:
-            errors.append("Возраст детей не указан")
-        
-        if errors:
-            # Определяем, к какому состоянию вернуться
-            if not context.checkin:
-                suggested = BookingState.ASK_CHECKIN
-            elif context.nights is None and not context.checkout:
-                suggested = BookingState.ASK_NIGHTS_OR_CHECKOUT
-            elif context.adults is None:
-                suggested = BookingState.ASK_ADULTS
-            else:
-                suggested = BookingState.ASK_CHILDREN_AGES
-            
-            return ValidationResult.error(errors, suggested_state=suggested)
-        
-        return ValidationResult.ok()
+            mask |= _MISSING_CHILDREN_AGES
+        return mask
+
+    def _validate_for_calculation(self, context: BookingContext) -> ValidationResult:
+        """Валидирует контекст для расчёта бронирования."""
+        mask = self._missing_for_calculation(context)
+        if not mask:
+            return ValidationResult.ok()
+
+        errors = [message for bit, message in _CALCULATION_ERRORS if mask & bit]
+        # Возвращаемся к самому раннему шагу с недостающими данными
+        suggested = _CALCULATION_SUGGESTED_STATE[mask & -mask]
+        return ValidationResult.error(errors, suggested_state=suggested)
 
     def ensure_valid_state(self, context: BookingContext) -> bool:
         """
@@ -254,12 +279,12 @@ class BookingContextValidator:
 
     def is_ready_for_calculation(self, context: BookingContext) -> bool:
         """Проверяет, готов ли контекст для расчёта."""
-        result = self._validate_for_calculation(context)
-        return result.is_valid
+        return not self._missing_for_calculation(context)
 
 
+@lru_cache(maxsize=1)
 def get_booking_context_validator() -> BookingContextValidator:
-    """Возвращает экземпляр BookingContextValidator."""
+    """Возвращает общий экземпляр BookingContextValidator (сервис без состояния)."""
     return BookingContextValidator()
 
 
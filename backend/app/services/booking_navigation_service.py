@@ -8,7 +8,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Set
+from functools import lru_cache
+from typing import Callable, Set
 
 from app.booking.fsm import BookingContext, BookingState
 
@@ -49,6 +50,11 @@ FSM_STATE_ORDER: list[BookingState] = [
     BookingState.CONFIRM_BOOKING,
 ]
 
+# Позиция состояния в FSM_STATE_ORDER (вместо линейного list.index)
+_STATE_INDEX: dict[BookingState, int] = {
+    state: idx for idx, state in enumerate(FSM_STATE_ORDER)
+}
+
 # Состояния, требующие наличия checkin
 STATES_REQUIRING_CHECKIN: Set[BookingState] = frozenset({
     BookingState.ASK_NIGHTS_OR_CHECKOUT,
@@ -59,6 +65,40 @@ STATES_REQUIRING_CHECKIN: Set[BookingState] = frozenset({
 })
 
 
+def _clear_checkin(context: BookingContext) -> None:
+    context.checkin = None
+    context.nights = None
+    context.checkout = None
+
+
+def _clear_nights(context: BookingContext) -> None:
+    context.nights = None
+    context.checkout = None
+
+
+def _clear_adults(context: BookingContext) -> None:
+    context.adults = None
+
+
+def _clear_children(context: BookingContext) -> None:
+    context.children = None
+    context.children_ages = []
+
+
+def _clear_children_ages(context: BookingContext) -> None:
+    context.children_ages = []
+
+
+# Какие данные стираются при возврате на состояние (go_back)
+_BACK_CLEAR: dict[BookingState, Callable[[BookingContext], None]] = {
+    BookingState.ASK_CHECKIN: _clear_checkin,
+    BookingState.ASK_NIGHTS_OR_CHECKOUT: _clear_nights,
+    BookingState.ASK_ADULTS: _clear_adults,
+    BookingState.ASK_CHILDREN_COUNT: _clear_children,
+    BookingState.ASK_CHILDREN_AGES: _clear_children_ages,
+}
+
+
 class BookingNavigationService:
     """Сервис для управления навигацией по состояниям FSM бронирования."""
 
@@ -91,20 +131,9 @@ class BookingNavigationService:
         previous = self._get_previous_state(context.state)
         
         # Очищаем данные в зависимости от целевого состояния
-        if previous == BookingState.ASK_CHECKIN:
-            context.checkin = None
-            context.nights = None
-            context.checkout = None
-        elif previous == BookingState.ASK_NIGHTS_OR_CHECKOUT:
-            context.nights = None
-            context.checkout = None
-        elif previous == BookingState.ASK_ADULTS:
-            context.adults = None
-        elif previous == BookingState.ASK_CHILDREN_COUNT:
-            context.children = None
-            context.children_ages = []
-        elif previous == BookingState.ASK_CHILDREN_AGES:
-            context.children_ages = []
+        clear = _BACK_CLEAR.get(previous)
+        if clear is not None:
+            clear(context)
         
         context.state = previous
         logger.debug(
@@ -116,10 +145,9 @@ class BookingNavigationService:
 
     def _get_previous_state(self, state: BookingState | None) -> BookingState:
         """Возвращает предыдущее состояние FSM."""
-        if state is None or state not in FSM_STATE_ORDER:
+        idx = _STATE_INDEX.get(state)
+        if idx is None:
             return BookingState.ASK_CHECKIN
-        
-        idx = FSM_STATE_ORDER.index(state)
         return FSM_STATE_ORDER[idx - 1] if idx > 0 else BookingState.ASK_CHECKIN
 
     def get_next_state(self, state: BookingState | None) -> BookingState | None:
@@ -127,10 +155,9 @@ class BookingNavigationService:
         if state is None:
             return BookingState.ASK_CHECKIN
         
-        if state not in FSM_STATE_ORDER:
+        idx = _STATE_INDEX.get(state)
+        if idx is None:
             return None
-        
-        idx = FSM_STATE_ORDER.index(state)
         if idx < len(FSM_STATE_ORDER) - 1:
             return FSM_STATE_ORDER[idx + 1]
         return None
@@ -172,8 +199,9 @@ class BookingNavigationService:
         logger.debug("Reset guests in booking context")
 
 
+@lru_cache(maxsize=1)
 def get_booking_navigation_service() -> BookingNavigationService:
-    """Возвращает экземпляр BookingNavigationService."""
+    """Возвращает общий экземпляр BookingNavigationService (сервис без состояния)."""
     return BookingNavigationService()
 
 
@@ -11,6 +11,7 @@ import json
 import logging
 from typing import Any
 
+import orjson
 import redis.asyncio as redis
 
 from app.core.config import get_settings
@@ -126,8 +127,8 @@ class RedisConversationStateStore:
             data = await self._redis.get(key)
             if data is None:
                 return None
-            decoded = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else str(data)
-            return json.loads(decoded)
+            # orjson разбирает bytes из Redis напрямую, без промежуточной str
+            return orjson.loads(data)
         except Exception as exc:
             logger.warning("Failed to get state from Redis: %s", exc)
             return None
@@ -170,11 +171,8 @@ class RedisConversationStateStore:
             if not data:
                 return []
             
-            messages = []
-            for item in reversed(data):  # Redis LPUSH добавляет в начало, разворачиваем
-                decoded = item.decode("utf-8") if isinstance(item, (bytes, bytearray)) else str(item)
-                messages.append(json.loads(decoded))
-            return messages
+            # Redis LPUSH добавляет в начало, разворачиваем
+            return [orjson.loads(item) for item in reversed(data)]
         except Exception as exc:
             logger.warning("Failed to get history from Redis: %s", exc)
             return []
@@ -190,11 +188,15 @@ class RedisConversationStateStore:
         """
         key = f"{self.history_prefix}{session_id}"
         try:
-            message = json.dumps({"role": role, "content": content}, ensure_ascii=False)
-            await self._redis.lpush(key, message)
-            # Обрезаем историю до max_history * 2 (user + assistant пары)
-            await self._redis.ltrim(key, 0, self._max_history * 2 - 1)
-            await self._redis.expire(key, self._ttl)
+            message = orjson.dumps({"role": role, "content": content})
+            # Список в Redis ограничен по длине: LPUSH добавляет за O(1), LTRIM
+            # обрезает до max_history * 2 (user + assistant пары). Все три
+            # команды уходят одним round-trip.
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.lpush(key, message)
+            pipe.ltrim(key, 0, self._max_history * 2 - 1)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
         except Exception as exc:
             logger.warning("Failed to add message to history: %s", exc)
 
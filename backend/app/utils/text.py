@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import re
 
-HEADING_RE = re.compile(r"^\s*#{1,6}\s*(.*)$")
-BULLET_RE = re.compile(r"^\s*[*-]\s*(.*)$")
+# Одно регулярное выражение на строку разбирает префикс разметки:
+# отступ, заголовок (#..######) и маркер списка (* или -), за которым
+# идёт непустой текст. Остаток строки берётся срезом.
+LINE_PREFIX_RE = re.compile(r"\s*(?:#{1,6}\s*)?(?P<bullet>[*-]\s*(?=\S))?")
 
 
 def _strip_bold_markers(text: str) -> str:
@@ -13,17 +15,11 @@ def _strip_bold_markers(text: str) -> str:
 
 
 def _normalize_line(line: str) -> str:
-    stripped = line.rstrip()
-
-    heading_match = HEADING_RE.match(stripped)
-    if heading_match:
-        stripped = heading_match.group(1)
-
-    bullet_match = BULLET_RE.match(stripped)
-    if bullet_match and bullet_match.group(1).strip():
-        return f"— {bullet_match.group(1).strip()}"
-
-    return stripped.strip()
+    prefix = LINE_PREFIX_RE.match(line)
+    text = line[prefix.end():].rstrip()
+    if prefix.group("bullet") is not None:
+        return f"— {text}"
+    return text
 
 
 def normalize_chat_text(text: str) -> str:
@@ -1,6 +1,6 @@
 """Вспомогательные классы для тестирования."""
 
-import json
+import orjson
 
 
 class DummyRequest:
@@ -8,9 +8,11 @@ class DummyRequest:
 
     def __init__(self, payload: dict):
         self._payload = payload
+        # Тело кодируется один раз — body() может вызываться многократно
+        self._body = orjson.dumps(payload)
 
     async def json(self):
         return self._payload
 
     async def body(self):
-        return json.dumps(self._payload).encode("utf-8")
+        return self._body
@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import orjson
+
+from app.llm.amvera_client import AmveraLLMClient
+
+
+def make_client(handler) -> AmveraLLMClient:
+    client = AmveraLLMClient(api_url="http://llm.test", model="deepseek", inference_name="chat")
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), headers=client._client.headers
+    )
+    return client
+
+
+def test_chat_sends_prebuilt_payload_and_headers():
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"role": "assistant", "text": "Привет"}}]}
+        )
+
+    client = make_client(handler)
+    messages = [{"role": "system", "content": "Ты помощник"}, {"role": "user", "content": "Привет"}]
+
+    async def scenario() -> tuple[str, str]:
+        first = await client.chat(messages=messages)
+        second = await client.chat(model="other", messages=messages)
+        return first, second
+
+    assert asyncio.run(scenario()) == ("Привет", "Привет")
+
+    first, second = (orjson.loads(request.content) for request in seen)
+    assert str(seen[0].url) == "http://llm.test/models/chat"
+    assert seen[0].headers["X-Auth-Token"] == "Bearer test-token"
+    assert first["model"] == "deepseek"
+    assert first["messages"] == [
+        {"role": "system", "text": "Ты помощник"},
+        {"role": "user", "text": "Привет"},
+    ]
+    assert second["model"] == "other"
+    assert "stream" not in second
+
+
+def test_chat_limits_concurrent_requests():
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"text": "ок"}}]})
+
+    client = make_client(handler)
+    client._semaphore = asyncio.Semaphore(2)
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(
+            *(client.chat(messages=[{"role": "user", "content": f"вопрос {i}"}]) for i in range(6))
+        )
+
+    assert asyncio.run(scenario()) == ["ок"] * 6
+    assert active["peak"] == 2
@@ -1,10 +1,4 @@
-import sys
 from datetime import date
-from pathlib import Path
-
-BACKEND_DIR = Path(__file__).resolve().parents[1]
-if str(BACKEND_DIR) not in sys.path:
-    sys.path.insert(0, str(BACKEND_DIR))
 
 from app.booking.entities import extract_booking_entities_ru
 from app.chat.intent import detect_intent
@@ -0,0 +1,43 @@
+from app.booking.fsm import BookingContext, BookingState
+from app.services.booking_context_validator import BookingContextValidator, _parse_iso_date
+
+
+def test_calculation_validation_lists_all_gaps_and_suggests_earliest_step():
+    validator = BookingContextValidator()
+    context = BookingContext(checkin="2025-07-01", children=2)
+
+    result = validator._validate_for_calculation(context)
+
+    assert not result.is_valid
+    assert result.errors == [
+        "Количество ночей или дата выезда не указаны",
+        "Количество взрослых не указано",
+        "Возраст детей не указан",
+    ]
+    assert result.suggested_state is BookingState.ASK_NIGHTS_OR_CHECKOUT
+    assert not validator.is_ready_for_calculation(context)
+
+
+def test_complete_context_is_ready_for_calculation():
+    validator = BookingContextValidator()
+    context = BookingContext(
+        checkin="2025-07-01", nights=2, adults=2, children=1, children_ages=[7]
+    )
+
+    assert validator._validate_for_calculation(context).is_valid
+    assert validator.is_ready_for_calculation(context)
+
+
+def test_stay_duration_validation_parses_dates_once_per_value():
+    validator = BookingContextValidator()
+    _parse_iso_date.cache_clear()
+    context = BookingContext(checkin="2025-07-03", checkout="2025-07-01")
+
+    for _ in range(3):
+        result = validator._validate_stay_duration(context)
+        assert result.errors == ["Дата выезда должна быть позже даты заезда"]
+
+    broken = validator._validate_stay_duration(BookingContext(checkin="2025-07-01", checkout="завтра"))
+
+    assert broken.errors == ["Дата выезда указана неверно"]
+    assert _parse_iso_date.cache_info().misses == 3
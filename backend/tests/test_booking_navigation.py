@@ -0,0 +1,35 @@
+from app.booking.fsm import BookingContext, BookingState
+from app.services.booking_navigation_service import BookingNavigationService
+
+
+def test_go_back_clears_only_data_of_target_state():
+    navigation = BookingNavigationService()
+    context = BookingContext(
+        checkin="2025-07-01",
+        nights=2,
+        checkout="2025-07-03",
+        adults=2,
+        children=1,
+        children_ages=[5],
+        state=BookingState.ASK_CHILDREN_AGES,
+    )
+
+    assert navigation.go_back(context) is BookingState.ASK_CHILDREN_COUNT
+    assert (context.children, context.children_ages, context.adults) == (None, [], 2)
+
+    context.state = BookingState.ASK_ADULTS
+    assert navigation.go_back(context) is BookingState.ASK_NIGHTS_OR_CHECKOUT
+    assert (context.checkin, context.nights, context.checkout) == ("2025-07-01", None, None)
+
+    assert navigation.go_back(context) is BookingState.ASK_CHECKIN
+    assert context.checkin is None
+
+
+def test_next_and_previous_state_use_fsm_order():
+    navigation = BookingNavigationService()
+
+    assert navigation.get_next_state(None) is BookingState.ASK_CHECKIN
+    assert navigation.get_next_state(BookingState.CALCULATE) is BookingState.AWAITING_USER_DECISION
+    assert navigation.get_next_state(BookingState.CONFIRM_BOOKING) is None
+    assert navigation.get_next_state(BookingState.DONE) is None
+    assert navigation._get_previous_state(BookingState.DONE) is BookingState.ASK_CHECKIN
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+    CircuitState,
+)
+
+
+async def ok() -> str:
+    return "ok"
+
+
+async def fail() -> str:
+    raise RuntimeError("boom")
+
+
+def test_breaker_opens_after_threshold_and_rejects_calls():
+    breaker = CircuitBreaker(
+        "test", CircuitBreakerConfig(failure_threshold=2, recovery_timeout=60.0)
+    )
+
+    async def scenario() -> list[str]:
+        results = [await breaker.call(fail, fallback="fallback") for _ in range(2)]
+        results.append(await breaker.call(ok, fallback="fallback"))
+        return results
+
+    assert asyncio.run(scenario()) == ["fallback", "fallback", "fallback"]
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.stats.rejected_calls == 1
+    assert breaker.stats.failed_calls == 2
+
+
+def test_breaker_recovers_through_half_open():
+    breaker = CircuitBreaker(
+        "test",
+        CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0.0, success_threshold=2),
+    )
+
+    async def scenario() -> None:
+        await breaker.call(fail, fallback="fallback")
+        assert breaker.state is CircuitState.OPEN
+        assert await breaker.call(ok) == "ok"
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert await breaker.call(ok) == "ok"
+
+    asyncio.run(scenario())
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.get_status()["stats"]["state_changes"] == 3
+
+
+def test_reset_closes_breaker():
+    breaker = CircuitBreaker("test", CircuitBreakerConfig(failure_threshold=1))
+
+    async def scenario() -> None:
+        await breaker.call(fail, fallback="fallback")
+        breaker.reset()
+
+    asyncio.run(scenario())
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.get_status()["failure_count"] == 0
+
+
+def test_recovery_window_uses_monotonic_clock(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("app.core.circuit_breaker.time.monotonic", lambda: clock["now"])
+    # Системные часы «уходят назад» — на окно восстановления это не влияет
+    monkeypatch.setattr("app.core.circuit_breaker.time.time", lambda: 0.0)
+    breaker = CircuitBreaker(
+        "test", CircuitBreakerConfig(failure_threshold=1, recovery_timeout=30.0)
+    )
+
+    async def scenario() -> list[str]:
+        results = [await breaker.call(fail, fallback="fallback")]
+        clock["now"] += 10
+        results.append(await breaker.call(ok, fallback="fallback"))
+        clock["now"] += 25
+        results.append(await breaker.call(ok, fallback="fallback"))
+        return results
+
+    assert asyncio.run(scenario()) == ["fallback", "fallback", "ok"]
+    assert breaker.state is CircuitState.HALF_OPEN
+
+
+def test_registry_returns_same_breaker_for_name():
+    registry = CircuitBreakerRegistry()
+
+    first = registry.get("llm_service")
+
+    assert registry.get("llm_service") is first
+    assert registry.get("embed_service") is not first
+    assert registry.list_names() == ["llm_service", "embed_service"]
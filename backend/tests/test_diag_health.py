@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import httpx
+
+from app.api.v1 import diag
+from app.core.config import get_settings
+from app.core.feature_flags import FeatureFlagsService
+from app.rag.embed_client import EmbedClient
+
+
+class FakeQdrant:
+    async def scroll(self, *, collection, limit):
+        return []
+
+
+class FakeSessionStore:
+    async def ping(self) -> bool:
+        return True
+
+
+def test_health_check_reports_embed_outage_after_cached_success(monkeypatch):
+    backend = {"up": True}
+    requests: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content)["texts"])
+        if not backend["up"]:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"vectors": [[0.1, 0.2]]})
+
+    client = EmbedClient(base_url="http://embed.test/embed")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    flags = FeatureFlagsService(get_settings())
+    monkeypatch.setattr("app.rag.embed_client.get_embed_client", lambda: client)
+    monkeypatch.setattr(diag, "get_feature_flags_service", lambda: flags)
+
+    async def scenario():
+        healthy = await diag.health_check(qdrant=FakeQdrant(), session_store=FakeSessionStore())
+        backend["up"] = False
+        degraded = await diag.health_check(qdrant=FakeQdrant(), session_store=FakeSessionStore())
+        await client.close()
+        return healthy, degraded
+
+    healthy, degraded = asyncio.run(scenario())
+
+    assert healthy.components["embed"] is True
+    assert degraded.components["embed"] is False
+    assert degraded.status == "degraded"
+    assert requests == [["health check"], ["health check"]]
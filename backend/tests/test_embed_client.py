@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.rag.embed_client import EmbedClient
+
+
+def make_client(handler) -> EmbedClient:
+    client = EmbedClient(base_url="http://embed.test/embed")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def vector(seed: int) -> list[float]:
+    return [seed + i / 1000 for i in range(768)]
+
+
+def test_embed_parses_small_and_large_responses():
+    requests: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        texts = json.loads(request.content)["texts"]
+        requests.append(texts)
+        return httpx.Response(
+            200, json={"dim": 768, "vectors": [vector(i) for i, _ in enumerate(texts)]}
+        )
+
+    client = make_client(handler)
+    many = [f"вопрос {i}" for i in range(8)]
+
+    async def scenario():
+        small = await client.embed(["заезд"])
+        large = await client.embed(many)
+        cached = await client.embed(many)
+        await client.close()
+        return small, large, cached
+
+    small, large, cached = asyncio.run(scenario())
+
+    assert small[1] is None and list(small[0][0]) == pytest.approx(vector(0))
+    assert large[1] is None and len(large[0]) == 8
+    assert large[0][7].typecode == "f"
+    assert list(large[0][7]) == pytest.approx(vector(7))
+    assert cached[0] == large[0]
+    assert requests == [["заезд"], many]
+
+
+def test_embed_reports_invalid_json():
+    client = make_client(lambda request: httpx.Response(200, content=b"not json"))
+
+    embeddings, error, _ = asyncio.run(client.embed(["заезд"]))
+
+    assert embeddings == []
+    assert error
+
+
+def test_parse_response_fast_path_and_fallback_shapes():
+    client = EmbedClient(base_url="http://embed.test/embed")
+
+    fast, fast_error = client._parse_response({"dim": 768, "vectors": [vector(1)]})
+    nested, nested_error = client._parse_response({"data": [{"embedding": vector(2)}]})
+    mixed, mixed_error = client._parse_response({"vectors": [vector(3)[:-1] + ["x"]]})
+
+    assert fast_error is None and fast[0].typecode == "f"
+    assert nested_error is None and list(nested[0]) == pytest.approx(vector(2))
+    assert mixed_error is None and len(mixed[0]) == 767
+    asyncio.run(client.close())
+
+
+def test_concurrent_identical_embeds_share_one_request():
+    requests: list[list[str]] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content)["texts"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"dim": 768, "vectors": [vector(0)]})
+
+    client = make_client(handler)
+
+    async def scenario():
+        results = await asyncio.gather(*(client.embed(["заезд"]) for _ in range(5)))
+        await client.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert requests == [["заезд"]]
+    assert all(error is None and len(vectors) == 1 for vectors, error, _ in results)
+
+
+def test_embed_one_batches_concurrent_single_texts():
+    requests: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        texts = json.loads(request.content)["texts"]
+        requests.append(texts)
+        return httpx.Response(
+            200, json={"dim": 768, "vectors": [vector(i) for i, _ in enumerate(texts)]}
+        )
+
+    client = make_client(handler)
+    client._batch_window = 0.005
+
+    async def scenario():
+        first = await asyncio.gather(
+            client.embed_one("заезд"), client.embed_one("парковка"), client.embed_one("заезд")
+        )
+        again = await client.embed_one("парковка")
+        await client.close()
+        return first, again
+
+    (checkin, parking, checkin_again), parking_cached = asyncio.run(scenario())
+
+    assert requests == [["заезд", "парковка"]]
+    assert list(checkin) == pytest.approx(vector(0))
+    assert list(parking) == pytest.approx(vector(1))
+    assert checkin_again == checkin
+    assert parking_cached == parking
+
+
+def test_embed_fetches_only_texts_missing_from_cache():
+    requests: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        texts = json.loads(request.content)["texts"]
+        requests.append(texts)
+        return httpx.Response(
+            200, json={"dim": 768, "vectors": [vector(len(text)) for text in texts]}
+        )
+
+    client = make_client(handler)
+
+    async def scenario():
+        await client.embed(["да"])
+        result = await client.embed(["Да ", "сколько стоит", "сколько  стоит"])
+        await client.close()
+        return result
+
+    embeddings, error, _ = asyncio.run(scenario())
+
+    assert requests == [["да"], ["сколько стоит"]]
+    assert error is None and len(embeddings) == 3
+    assert list(embeddings[0]) == pytest.approx(vector(2))
+    assert embeddings[1] is embeddings[2]
@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.db.pool import _init_connection
+from app.db.queries.faq import FAQ_SEARCH_SQL, search_faq
+
+
+class FakeConnection:
+    def __init__(self, rows=None, error: Exception | None = None) -> None:
+        self.calls: list[tuple] = []
+        self._rows = rows or []
+        self._error = error
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        if self._error:
+            raise self._error
+        return self._rows
+
+
+class FakePool:
+    def __init__(self, conn: FakeConnection) -> None:
+        self._conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self._conn
+
+
+def test_search_faq_passes_threshold_to_sql():
+    conn = FakeConnection(rows=[{"question": "Заезд?", "answer": "С 14:00", "similarity": 0.8}])
+
+    result = asyncio.run(search_faq(FakePool(conn), query="заезд", limit=3, min_similarity=0.4))
+
+    assert result == [{"question": "Заезд?", "answer": "С 14:00", "similarity": 0.8}]
+    assert conn.calls == [(FAQ_SEARCH_SQL, ("заезд", 3, 0.4))]
+
+
+def test_connection_init_warms_faq_statement_and_ignores_errors():
+    conn = FakeConnection()
+    asyncio.run(_init_connection(conn))
+    assert conn.calls[0][0] == FAQ_SEARCH_SQL
+
+    broken = FakeConnection(error=RuntimeError("relation does not exist"))
+    asyncio.run(_init_connection(broken))
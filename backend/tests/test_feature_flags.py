@@ -0,0 +1,47 @@
+import asyncio
+
+from app.core.config import get_settings
+from app.core.feature_flags import FeatureFlagsService
+
+
+def make_service(**overrides) -> FeatureFlagsService:
+    return FeatureFlagsService(get_settings().model_copy(update=overrides))
+
+
+def test_flags_are_looked_up_by_name():
+    service = make_service(llm_streaming_enabled=True, llm_dry_run=False)
+
+    assert service.is_enabled("llm_streaming_enabled")
+    assert not service.is_enabled("llm_dry_run")
+    assert service.get_flag("missing") is None
+    assert service.get_flag("circuit_breaker").details["threshold"] == get_settings().circuit_breaker_threshold
+
+
+def test_health_status_update_is_visible_in_summary():
+    service = make_service(use_redis_state_store=True, use_redis_cache=False)
+
+    asyncio.run(service.update_health_status(redis_healthy=False))
+    summary = service.get_summary()
+
+    storage = {flag["name"]: flag for flag in summary["by_category"]["storage"]}
+    caching = {flag["name"]: flag for flag in summary["by_category"]["caching"]}
+    assert storage["use_redis_state_store"]["health_status"] == "degraded"
+    assert caching["use_redis_cache"]["health_status"] == "disabled"
+    assert summary["total_flags"] == 7
+
+
+def test_summary_is_cached_until_health_changes():
+    service = make_service(use_redis_state_store=True)
+
+    first = service.get_summary()
+    assert service.get_summary() is first
+    assert [flag.name for flag in service.get_flags_by_category("llm")] == [
+        "llm_streaming_enabled",
+        "llm_dry_run",
+    ]
+
+    asyncio.run(service.update_health_status(redis_healthy=True))
+    refreshed = service.get_summary()
+
+    assert refreshed is not first
+    assert refreshed["by_category"]["storage"][0]["health_status"] == "healthy"
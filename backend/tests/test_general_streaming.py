@@ -0,0 +1,155 @@
+import asyncio
+
+from app.booking.slot_filling import SlotFiller
+from app.chat import composer as composer_module
+from app.chat.composer import ChatComposer, InMemoryConversationStateStore
+from app.core.config import get_settings
+
+
+class StreamingLLM:
+    def __init__(self, chunks: list[str], fail: bool = False) -> None:
+        self._chunks = chunks
+        self._fail = fail
+
+    async def chat_stream(self, *, model=None, messages):
+        for chunk in self._chunks:
+            yield chunk
+        if self._fail:
+            raise RuntimeError("stream broken")
+
+
+class SlowLLM:
+    def __init__(self, delay: float) -> None:
+        self._delay = delay
+        self.finished = False
+
+    async def chat(self, *, model=None, messages):
+        await asyncio.sleep(self._delay)
+        self.finished = True
+        return "Заезд с 14:00."
+
+
+async def fake_gather_rag_data(**_kwargs):
+    return {
+        "qdrant_hits": [{"text": "Заезд с 14:00, выезд до 12:00.", "score": 0.9}],
+        "faq_hits": [],
+        "hits_total": 1,
+    }
+
+
+class HistoryStore(InMemoryConversationStateStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[tuple[str, str, str]] = []
+
+    async def add_message(self, session_id: str, role: str, content: str) -> None:
+        self.messages.append((session_id, role, content))
+
+    async def get_history(self, session_id: str) -> list[dict[str, str]]:
+        return [
+            {"role": role, "content": content}
+            for sid, role, content in self.messages
+            if sid == session_id
+        ]
+
+
+def make_composer(
+    monkeypatch,
+    llm,
+    *,
+    streaming: bool = True,
+    hedge_timeout: float = 0.0,
+    store: InMemoryConversationStateStore | None = None,
+) -> ChatComposer:
+    monkeypatch.setattr("app.chat.composer.gather_rag_data", fake_gather_rag_data)
+    settings = get_settings().model_copy(
+        update={
+            "llm_streaming_enabled": streaming,
+            "llm_cache_enabled": False,
+            "use_redis_state_store": store is not None,
+            "rag_min_facts": 1,
+            "llm_hedge_timeout": hedge_timeout,
+        }
+    )
+    return ChatComposer(
+        pool=None,  # type: ignore[arg-type]
+        qdrant=None,  # type: ignore[arg-type]
+        llm=llm,  # type: ignore[arg-type]
+        slot_filler=SlotFiller(),
+        booking_service=None,  # type: ignore[arg-type]
+        store=store or InMemoryConversationStateStore(),
+        settings=settings,
+    )
+
+
+async def collect(composer: ChatComposer, text: str) -> list[dict]:
+    return [event async for event in composer.stream_general(text)]
+
+
+def test_stream_general_yields_deltas_then_final_answer(monkeypatch):
+    composer = make_composer(monkeypatch, StreamingLLM(["Заезд ", "с 14:00."]))
+
+    events = asyncio.run(collect(composer, "Во сколько заезд?"))
+
+    assert [event["delta"] for event in events[:-1]] == ["Заезд ", "с 14:00."]
+    final = events[-1]
+    assert "Заезд с 14:00" in final["answer"]
+    assert final["debug"]["llm_streamed"] is True
+
+
+def test_stream_general_falls_back_to_rag_answer_on_error(monkeypatch):
+    composer = make_composer(monkeypatch, StreamingLLM(["Зае"], fail=True))
+
+    events = asyncio.run(collect(composer, "Во сколько заезд?"))
+
+    final = events[-1]
+    assert "delta" not in final
+    assert final["debug"]["llm_error"] == "stream broken"
+    assert final["answer"]
+
+
+def test_handle_general_hedges_slow_llm_with_rag_answer(monkeypatch):
+    llm = SlowLLM(delay=0.05)
+    composer = make_composer(monkeypatch, llm, hedge_timeout=0.01)
+
+    async def scenario() -> dict:
+        result = await composer.handle_general("Во сколько заезд?")
+        assert not llm.finished
+        # Ссылку на фоновую задачу держит модуль, а не композер запроса
+        assert len(composer_module._BACKGROUND_TASKS) == 1
+        await asyncio.sleep(0.1)
+        assert not composer_module._BACKGROUND_TASKS
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result["debug"]["llm_hedged"] is True
+    assert "14:00" in result["answer"]
+    assert llm.finished
+
+
+def test_handle_general_saves_hedged_turn_to_history(monkeypatch):
+    store = HistoryStore()
+    composer = make_composer(monkeypatch, SlowLLM(delay=0.05), hedge_timeout=0.01, store=store)
+
+    async def scenario() -> dict:
+        result = await composer.handle_general("Во сколько заезд?", session_id="s1")
+        await asyncio.sleep(0.1)
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result["debug"]["llm_hedged"] is True
+    assert store.messages == [
+        ("s1", "user", "Во сколько заезд?"),
+        ("s1", "assistant", result["answer"]),
+    ]
+
+
+def test_handle_general_waits_for_llm_within_hedge_deadline(monkeypatch):
+    composer = make_composer(monkeypatch, SlowLLM(delay=0), hedge_timeout=0.5)
+
+    result = asyncio.run(composer.handle_general("Во сколько заезд?"))
+
+    assert "llm_hedged" not in result["debug"]
+    assert result["answer"].startswith("Заезд с 14:00")
@@ -0,0 +1,105 @@
+import asyncio
+
+from app.core import config
+from app.llm.cache import (
+    LLMCache,
+    _make_cache_key,
+    _NullLLMCache,
+    get_llm_cache,
+    reset_llm_cache,
+)
+
+
+def test_cache_key_ignores_case_and_spacing_but_not_intent_or_context():
+    key = _make_cache_key("Во сколько  заезд?", "general", "контекст", context_hash_length=500)
+
+    assert key == _make_cache_key(" во сколько заезд? ", "general", "контекст", context_hash_length=500)
+    assert len(key) == 32
+    assert key != _make_cache_key("Во сколько заезд?", "lodging", "контекст", context_hash_length=500)
+    assert key != _make_cache_key("Во сколько заезд?", "general", "другой", context_hash_length=500)
+
+
+def test_cache_key_uses_only_context_prefix():
+    base = _make_cache_key("вопрос", "general", "abc", context_hash_length=3)
+
+    assert base == _make_cache_key("вопрос", "general", "abcdef", context_hash_length=3)
+
+
+def test_llm_cache_roundtrip_and_stats():
+    cache = LLMCache(max_size=2)
+
+    async def scenario():
+        await cache.set("Вопрос", "general", "ctx", "Ответ", debug_info={"llm_latency_ms": 5})
+        hit = await cache.get("вопрос", "general", "ctx")
+        miss = await cache.get("вопрос", "general", "другой контекст")
+        return hit, miss
+
+    hit, miss = asyncio.run(scenario())
+
+    assert hit == ("Ответ", {"llm_latency_ms": 5})
+    assert miss == (None, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_llm_cache_evicts_least_recently_used():
+    cache = LLMCache(max_size=2)
+
+    async def scenario():
+        await cache.set("a", "general", "", "A")
+        await cache.set("b", "general", "", "B")
+        await cache.get("a", "general")
+        await cache.set("c", "general", "", "C")
+        return [(await cache.get(q, "general"))[0] for q in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == ["A", None, "C"]
+
+
+def test_llm_cache_accepts_precomputed_key():
+    cache = LLMCache()
+    key = cache.make_key("Вопрос", "general", "ctx")
+
+    async def scenario():
+        await cache.set("Вопрос", "general", "ctx", "Ответ", key=key)
+        return await cache.get("вопрос ", "general", "ctx"), await cache.get("", "", key=key)
+
+    by_text, by_key = asyncio.run(scenario())
+
+    assert by_text[0] == "Ответ"
+    assert by_key[0] == "Ответ"
+
+
+def test_disabled_llm_cache_is_a_no_op(monkeypatch):
+    settings = config.get_settings().model_copy(update={"llm_cache_enabled": False})
+    monkeypatch.setattr(config, "get_settings", lambda: settings)
+    reset_llm_cache()
+    try:
+        cache = get_llm_cache()
+
+        async def scenario():
+            await cache.set("Вопрос", "general", "ctx", "Ответ")
+            return await cache.get("Вопрос", "general", "ctx")
+
+        assert isinstance(cache, _NullLLMCache)
+        assert asyncio.run(scenario()) == (None, None)
+        assert cache.stats()["size"] == 0
+    finally:
+        reset_llm_cache()
+
+
+def test_llm_cache_evicts_in_batches_past_slack():
+    cache = LLMCache(max_size=32)
+
+    async def scenario():
+        for i in range(34):
+            await cache.set(f"q{i}", "general", "", f"A{i}")
+        before_trim = cache.stats()["size"]
+        await cache.set("q34", "general", "", "A34")
+        return before_trim, (await cache.get("q2", "general"))[0], (await cache.get("q3", "general"))[0]
+
+    before_trim, evicted, kept = asyncio.run(scenario())
+
+    assert before_trim == 34
+    assert cache.stats()["size"] == 32
+    assert evicted is None
+    assert kept == "A3"
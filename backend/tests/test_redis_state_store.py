@@ -0,0 +1,68 @@
+import asyncio
+
+import orjson
+
+from app.session.redis_state_store import RedisConversationStateStore
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._commands: list[tuple] = []
+
+    def lpush(self, key, value):
+        self._commands.append(("lpush", key, value))
+
+    def ltrim(self, key, start, end):
+        self._commands.append(("ltrim", key, start, end))
+
+    def expire(self, key, ttl):
+        self._commands.append(("expire", key, ttl))
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        for name, key, *args in self._commands:
+            if name == "lpush":
+                self._redis.lists.setdefault(key, []).insert(0, args[0])
+            elif name == "ltrim":
+                start, end = args
+                self._redis.lists[key] = self._redis.lists[key][start : end + 1]
+            else:
+                self._redis.ttls[key] = args[0]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.lists: dict[str, list[str]] = {}
+        self.ttls: dict[str, int] = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def lrange(self, key, start, end):
+        self.round_trips += 1
+        return self.lists.get(key, [])[start : end + 1]
+
+
+def test_add_message_keeps_bounded_history_in_one_round_trip():
+    redis = FakeRedis()
+    store = RedisConversationStateStore(redis, ttl_seconds=60, max_history=1)
+
+    async def scenario():
+        for i in range(3):
+            await store.add_message("s1", "user", f"вопрос {i}")
+        return await store.get_history("s1")
+
+    history = asyncio.run(scenario())
+
+    assert redis.round_trips == 4
+    assert redis.ttls == {"u4s:history:s1": 60}
+    assert [orjson.loads(item)["content"] for item in redis.lists["u4s:history:s1"]] == [
+        "вопрос 2",
+        "вопрос 1",
+    ]
+    assert history == [
+        {"role": "user", "content": "вопрос 1"},
+        {"role": "user", "content": "вопрос 2"},
+    ]
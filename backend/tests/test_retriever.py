@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import orjson
+
+from app.rag import retriever
+from app.rag.embed_client import EmbedClient
+
+
+def test_gather_rag_data_runs_faq_search_while_embedding(monkeypatch):
+    events: list[str] = []
+
+    async def fake_embed_texts(texts):
+        events.append("embed:start")
+        await asyncio.sleep(0.01)
+        events.append("embed:end")
+        return [[0.1, 0.2]], None, 10
+
+    async def fake_search_faq(pool, *, query, limit, min_similarity):
+        events.append("faq:start")
+        return [{"question": "Заезд?", "answer": "С 14:00", "similarity": 0.9}]
+
+    async def fake_qdrant_search_batch(vectors, *, client, limit):
+        return [[{"id": 1, "score": 0.8, "payload": {"text": "Заезд с 14:00"}}] for _ in vectors]
+
+    monkeypatch.setattr(retriever, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(retriever, "search_faq", fake_search_faq)
+    monkeypatch.setattr(retriever, "qdrant_search_batch", fake_qdrant_search_batch)
+
+    result = asyncio.run(
+        retriever.gather_rag_data(
+            "Во сколько заезд?", client=None, pool=None, use_cache=False
+        )
+    )
+
+    assert events.index("faq:start") < events.index("embed:end")
+    assert len(result["faq_hits"]) == 1
+    assert result["hits_total"] >= 1
+
+
+def test_gather_rag_data_sends_expanded_queries_in_one_batch(monkeypatch):
+    batches: list[int] = []
+
+    async def fake_embed_texts(texts):
+        return [[float(i)] for i, _ in enumerate(texts, start=1)], None, 5
+
+    async def fake_search_faq(pool, *, query, limit, min_similarity):
+        return []
+
+    async def fake_qdrant_search_batch(vectors, *, client, limit):
+        batches.append(len(vectors))
+        return [
+            [{"id": i, "score": 0.5, "payload": {"text": f"Домик {i}", "entity_id": f"e{i}"}}]
+            for i, _ in enumerate(vectors)
+        ]
+
+    monkeypatch.setattr(retriever, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(retriever, "search_faq", fake_search_faq)
+    monkeypatch.setattr(retriever, "qdrant_search_batch", fake_qdrant_search_batch)
+
+    result = asyncio.run(
+        retriever.gather_rag_data(
+            "домики", client=None, pool=None, intent="lodging", use_cache=False
+        )
+    )
+
+    assert batches == [4]
+    assert result["merged_hits_count"] == 4
+
+
+def test_retrieve_context_runs_files_search_alongside_facts(monkeypatch):
+    events: list[str] = []
+
+    async def fake_embed_query(text):
+        return [0.1, 0.2]
+
+    async def fake_qdrant_search(vector, *, client, limit, source_prefix):
+        events.append(f"{source_prefix}:start")
+        await asyncio.sleep(0.01)
+        events.append(f"{source_prefix}:end")
+        return [{"score": 0.5, "payload": {"text": f"{source_prefix} факт"}}]
+
+    monkeypatch.setattr(retriever, "embed_query", fake_embed_query)
+    monkeypatch.setattr(retriever, "qdrant_search", fake_qdrant_search)
+
+    result = asyncio.run(retriever.retrieve_context("заезд", client=None))
+
+    assert events[:2] == ["postgres:u4s_chatbot:start", "file::start"]
+    assert [hit["text"] for hit in result["facts_hits"]] == ["postgres:u4s_chatbot факт"]
+    assert [hit["text"] for hit in result["files_hits"]] == ["file: факт"]
+
+
+def test_rag_cache_expires_entries_by_injected_clock():
+    clock = {"now": 1000.0}
+    cache = retriever.RAGCache(ttl_seconds=60, clock=lambda: clock["now"])
+
+    async def scenario():
+        await cache.set("Заезд", "general", {"facts_hits": []})
+        fresh = await cache.get(" заезд ", "general")
+        clock["now"] += 61
+        expired = await cache.get("заезд", "general")
+        return fresh, expired
+
+    assert asyncio.run(scenario()) == ({"facts_hits": []}, None)
+
+
+def test_concurrent_gather_rag_data_calls_share_one_embed_request(monkeypatch):
+    requests: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        texts = orjson.loads(request.content)["texts"]
+        requests.append(texts)
+        return httpx.Response(200, json={"vectors": [[float(i), 0.5] for i, _ in enumerate(texts)]})
+
+    embed_client = EmbedClient(base_url="http://embed.test/embed")
+    embed_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    embed_client._batch_window = 0.005
+
+    async def fake_search_faq(pool, *, query, limit, min_similarity):
+        return []
+
+    async def fake_qdrant_search_batch(vectors, *, client, limit):
+        return [[{"id": 1, "score": 0.8, "payload": {"text": "Заезд с 14:00"}}] for _ in vectors]
+
+    monkeypatch.setattr(retriever, "get_embed_client", lambda: embed_client)
+    monkeypatch.setattr(retriever, "search_faq", fake_search_faq)
+    monkeypatch.setattr(retriever, "qdrant_search_batch", fake_qdrant_search_batch)
+
+    async def scenario():
+        results = await asyncio.gather(
+            retriever.gather_rag_data("Во сколько заезд?", client=None, pool=None, use_cache=False),
+            retriever.gather_rag_data("Есть ли парковка?", client=None, pool=None, use_cache=False),
+        )
+        await embed_client.close()
+        return results
+
+    first, second = asyncio.run(scenario())
+
+    assert requests == [["Во сколько заезд?", "Есть ли парковка?"]]
+    assert first["hits_total"] >= 1 and second["hits_total"] >= 1
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    flight: SingleFlight[str] = SingleFlight()
+    calls: list[str] = []
+
+    async def fetch() -> str:
+        calls.append("fetch")
+        await asyncio.sleep(0.01)
+        return "ответ"
+
+    async def scenario() -> list[str]:
+        results = await asyncio.gather(*(flight.do("q", fetch) for _ in range(5)))
+        assert len(flight) == 0
+        return results
+
+    assert asyncio.run(scenario()) == ["ответ"] * 5
+    assert calls == ["fetch"]
+
+
+def test_different_keys_are_not_merged_and_errors_reach_all_waiters():
+    flight: SingleFlight[str] = SingleFlight()
+    calls: list[str] = []
+
+    async def fail() -> str:
+        calls.append("fail")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def ok() -> str:
+        calls.append("ok")
+        return "ok"
+
+    async def scenario() -> list[object]:
+        return await asyncio.gather(
+            flight.do("a", fail),
+            flight.do("a", fail),
+            flight.do("b", ok),
+            return_exceptions=True,
+        )
+
+    first, second, third = asyncio.run(scenario())
+    assert isinstance(first, RuntimeError) and isinstance(second, RuntimeError)
+    assert third == "ok"
+    assert sorted(calls) == ["fail", "ok"]
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def fetch() -> str:
+        await asyncio.sleep(0.02)
+        return "готово"
+
+    async def scenario() -> str:
+        leader = asyncio.create_task(flight.do("q", fetch))
+        follower = asyncio.create_task(flight.do("q", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "готово"
@@ -1,12 +1,5 @@
-from pathlib import Path
-import sys
-
 import pytest
 
-BACKEND_DIR = Path(__file__).resolve().parents[1]
-if str(BACKEND_DIR) not in sys.path:
-    sys.path.insert(0, str(BACKEND_DIR))
-
 from app.booking.slot_filling import SlotFiller
 
 
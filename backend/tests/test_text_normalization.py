@@ -2,46 +2,59 @@ import textwrap
 
 from app.utils.text import normalize_chat_text
 
+_RAW_MARKDOWN_LIST = (
+    "Да, есть баня.\n"
+    "**Условия:**\n"
+    "* Баня работает круглый год\n"
+    "* Аренда по часам\n"
+)
+
+_EXPECTED_MARKDOWN_LIST = (
+    "Да, есть баня.\n"
+    "Условия:\n"
+    "— Баня работает круглый год\n"
+    "— Аренда по часам"
+)
+
+_RAW_HEADINGS = textwrap.dedent(
+    """
+    # Заголовок
+
+    - Первый пункт
+
+    __Второй__ пункт
+    ### Подзаголовок
+    - Третий пункт
+    """
+)
+
+_EXPECTED_HEADINGS = (
+    "Заголовок\n"
+    "\n"
+    "— Первый пункт\n"
+    "\n"
+    "Второй пункт\n"
+    "Подзаголовок\n"
+    "— Третий пункт"
+)
 
-def test_normalize_chat_text_removes_markdown_and_formats_lists():
-    raw = (
-        "Да, есть баня.\n"
-        "**Условия:**\n"
-        "* Баня работает круглый год\n"
-        "* Аренда по часам\n"
-    )
-
-    result = normalize_chat_text(raw)
 
-    assert result == (
-        "Да, есть баня.\n"
-        "Условия:\n"
-        "— Баня работает круглый год\n"
-        "— Аренда по часам"
-    )
+def test_normalize_chat_text_removes_markdown_and_formats_lists():
+    assert normalize_chat_text(_RAW_MARKDOWN_LIST) == _EXPECTED_MARKDOWN_LIST
 
 
 def test_normalize_chat_text_strips_headings_and_collapses_blank_lines():
-    raw = textwrap.dedent(
-        """
-        # Заголовок
+    assert normalize_chat_text(_RAW_HEADINGS) == _EXPECTED_HEADINGS
 
-        - Первый пункт
 
-        __Второй__ пункт
-        ### Подзаголовок
-        - Третий пункт
-        """
-    )
+def test_normalize_chat_text_handles_markup_edge_cases():
+    raw = "## - Пункт в заголовке\n-\n####### Семь решёток\n  *   отступ  \n#"
 
     result = normalize_chat_text(raw)
 
     assert result == (
-        "Заголовок\n"
-        "\n"
-        "— Первый пункт\n"
-        "\n"
-        "Второй пункт\n"
-        "Подзаголовок\n"
-        "— Третий пункт"
+        "— Пункт в заголовке\n"
+        "-\n"
+        "# Семь решёток\n"
+        "— отступ"
     )